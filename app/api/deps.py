@@ -1,14 +1,22 @@
 from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import security
 from app.core.config import settings
 from app.db.session import get_db
 from app.models.user import User
-from app.schemas.token import TokenPayload
+from app.repositories.base import IdempotencyRepository, TaskRepository, UserRepository
+from app.repositories.memory import (
+    InMemoryIdempotencyRepository,
+    InMemoryTaskRepository,
+    InMemoryUserRepository,
+)
+from app.repositories.sql import (
+    SQLAlchemyIdempotencyRepository,
+    SQLAlchemyTaskRepository,
+    SQLAlchemyUserRepository,
+)
 
 # Use HTTPBearer for JSON-based login (not OAuth2 form)
 security_scheme = HTTPBearer(
@@ -16,8 +24,27 @@ security_scheme = HTTPBearer(
     description="Enter the JWT token obtained from POST /api/v1/auth/login"
 )
 
+def get_task_repository(db: AsyncSession = Depends(get_db)) -> TaskRepository:
+    # The session is only opened when a query runs, so the memory backend does no I/O
+    if settings.STORAGE_BACKEND == "memory":
+        return InMemoryTaskRepository()
+    return SQLAlchemyTaskRepository(db)
+
+def get_user_repository(db: AsyncSession = Depends(get_db)) -> UserRepository:
+    if settings.STORAGE_BACKEND == "memory":
+        return InMemoryUserRepository()
+    return SQLAlchemyUserRepository(db)
+
+def get_idempotency_repository(db: AsyncSession = Depends(get_db)) -> IdempotencyRepository:
+    # Same (per-request) session as get_task_repository: the write and the
+    # stored response commit together
+    if settings.STORAGE_BACKEND == "memory":
+        return InMemoryIdempotencyRepository()
+    return SQLAlchemyIdempotencyRepository(db)
+
 async def get_current_user(
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    users: UserRepository = Depends(get_user_repository),
     credentials: HTTPAuthorizationCredentials = Depends(security_scheme)
 ) -> User:
     credentials_exception = HTTPException(
@@ -25,22 +52,13 @@ async def get_current_user(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        token = credentials.credentials
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        sub: str = payload.get("sub")
-        if sub is None:
-            raise credentials_exception
-        token_data = TokenPayload(sub=sub)
-    except JWTError:
+    # `credentials` makes the header required; the token itself is decoded
+    # once per request and shared with the rate limiter
+    sub = security.get_request_subject(request)
+    if sub is None:
         raise credentials_exception
     
-    # In async sqlalchemy we need to execute a select
-    stmt = select(User).where(User.email == token_data.sub)
-    result = await db.execute(stmt)
-    user = result.scalars().first()
+    user = await users.get_by_email(sub)
     
     if user is None:
         raise credentials_exception
@@ -1,11 +1,11 @@
 from datetime import timedelta
 from typing import Any
 from fastapi import Depends, HTTPException, status, Request
-from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api import deps
 from app.core import security
 from app.core.config import settings
-from app.db.session import get_db
+from app.repositories.base import UserRepository
 from app.schemas.token import Token
 from app.schemas.user import LoginRequest
 from app.schemas.response import Envelope, Meta
@@ -20,9 +20,9 @@ class AuthController:
         self,
         request: Request,
         login_data: LoginRequest,
-        db: AsyncSession = Depends(get_db),
+        users: UserRepository = Depends(deps.get_user_repository),
     ) -> Any:
-        user = await self.service.authenticate_user(db, login_data.username, login_data.password)
+        user = await self.service.authenticate_user(users, login_data.username, login_data.password)
         
         if not user:
             raise HTTPException(
@@ -0,0 +1,61 @@
+import asyncio
+from typing import Any
+from fastapi import Depends, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.load_shedding import concurrency_limiter
+from app.db.session import get_db, get_pool_status
+from app.jobs.outbox_worker import outbox_worker
+from app.schemas.response import Envelope, Meta
+
+
+class HealthController:
+
+    async def liveness(self, request: Request) -> Any:
+        return Envelope(
+            data={
+                "status": "alive",
+                "limiter": concurrency_limiter.snapshot(),
+            },
+            meta=Meta(request_id=getattr(request.state, "request_id", None))
+        )
+
+    async def readiness(
+        self,
+        request: Request,
+        db: AsyncSession = Depends(get_db),
+    ) -> Any:
+        if settings.STORAGE_BACKEND == "memory":
+            database = "not_used"
+        else:
+            try:
+                await asyncio.wait_for(
+                    db.execute(text("SELECT 1")), timeout=settings.HEALTH_DB_TIMEOUT_SECONDS
+                )
+                database = "ok"
+            except Exception:
+                database = "unavailable"
+
+        # A busy pod is still ready: failing here would move its load onto the
+        # others. The limiter sheds the excess and is only reported.
+        limiter = concurrency_limiter.snapshot()
+        ready = database != "unavailable"
+
+        envelope = Envelope(
+            data={
+                "status": "ready" if ready else "not_ready",
+                "database": database,
+                "pool": get_pool_status(),
+                "limiter": limiter,
+                "outbox": outbox_worker.snapshot(),
+            },
+            meta=Meta(request_id=getattr(request.state, "request_id", None))
+        )
+
+        return JSONResponse(
+            status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+            content=envelope.model_dump(mode="json"),
+        )
@@ -1,28 +1,91 @@
-from typing import Any
+from typing import Any, Awaitable, Callable, Optional
 from fastapi import Depends, HTTPException, status, Query, Request, Response
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
 
 from app.api import deps
-from app.db.session import get_db
 from app.models.user import User
+from app.repositories.base import IdempotencyRepository, TaskRepository
 from app.schemas.task import Task as TaskSchema, TaskCreate, TaskUpdate
 from app.schemas.response import Envelope, Meta, PaginatedEnvelope, PaginatedData, PaginationMeta
+from app.services.idempotency_service import (
+    IdempotencyKeyInProgressError,
+    IdempotencyKeyReusedError,
+    IdempotencyService,
+)
 from app.services.task_service import TaskService
 
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
 
 class TaskController:
     def __init__(self):
         self.service = TaskService()
 
+    async def _idempotent(
+        self,
+        request: Request,
+        idempotency: IdempotencyRepository,
+        current_user: User,
+        status_code: int,
+        operation: Callable[[], Awaitable[Optional[BaseModel]]],
+    ) -> Any:
+        """
+        Run a write operation honouring the Idempotency-Key header.
+
+        Without the header the operation runs as usual. With it, the first
+        response is stored and replayed for retries with the same key.
+        """
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            result = await operation()
+            return result if result is not None else Response(status_code=status_code)
+
+        if len(key) > 255:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{IDEMPOTENCY_HEADER} must be at most 255 characters"
+            )
+
+        async def run():
+            result = await operation()
+            return status_code, (result.model_dump(mode="json") if result is not None else None)
+
+        request_hash = IdempotencyService.fingerprint(
+            request.method, request.url.path, await request.body()
+        )
+        try:
+            (stored_status, body), replayed = await idempotency.execute(
+                current_user.id, key, request_hash, run
+            )
+        except IdempotencyKeyReusedError:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"{IDEMPOTENCY_HEADER} was already used with a different request"
+            )
+        except IdempotencyKeyInProgressError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"A request with this {IDEMPOTENCY_HEADER} is still being processed",
+                headers={"Retry-After": "1"},
+            )
+
+        headers = {IDEMPOTENCY_HEADER: key}
+        if replayed:
+            headers["Idempotent-Replayed"] = "true"
+        if body is None:
+            return Response(status_code=stored_status, headers=headers)
+        return JSONResponse(status_code=stored_status, content=body, headers=headers)
+
     async def read_tasks(
         self,
         request: Request,
-        db: AsyncSession = Depends(get_db),
+        repository: TaskRepository = Depends(deps.get_task_repository),
         page: int = Query(1, ge=1, description="Page number"),
         size: int = Query(10, ge=1, le=100, description="Page size"),
         current_user: User = Depends(deps.get_current_user),
     ) -> Any:
-        tasks, total, pages = await self.service.get_tasks(db, current_user.id, page, size)
+        tasks, total, pages = await self.service.get_tasks(repository, current_user.id, page, size)
         
         return PaginatedEnvelope(
             data=PaginatedData(
@@ -41,24 +104,29 @@ class TaskController:
         self,
         request: Request,
         task_in: TaskCreate,
-        db: AsyncSession = Depends(get_db),
+        idempotency: IdempotencyRepository = Depends(deps.get_idempotency_repository),
+        repository: TaskRepository = Depends(deps.get_task_repository),
         current_user: User = Depends(deps.get_current_user),
     ) -> Any:
-        task = await self.service.create_task(db, task_in, current_user.id)
-        
-        return Envelope(
-            data=task,
-            meta=Meta(request_id=getattr(request.state, "request_id", None))
+        async def operation():
+            task = await self.service.create_task(repository, task_in, current_user.id)
+            return Envelope[TaskSchema](
+                data=task,
+                meta=Meta(request_id=getattr(request.state, "request_id", None))
+            )
+
+        return await self._idempotent(
+            request, idempotency, current_user, status.HTTP_201_CREATED, operation
         )
 
     async def read_task(
         self,
         request: Request,
         id: int,
-        db: AsyncSession = Depends(get_db),
+        repository: TaskRepository = Depends(deps.get_task_repository),
         current_user: User = Depends(deps.get_current_user),
     ) -> Any:
-        task = await self.service.get_task(db, id, current_user.id)
+        task = await self.service.get_task(repository, id, current_user.id)
         if not task:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -75,32 +143,44 @@ class TaskController:
         request: Request,
         id: int,
         task_in: TaskUpdate,
-        db: AsyncSession = Depends(get_db),
+        idempotency: IdempotencyRepository = Depends(deps.get_idempotency_repository),
+        repository: TaskRepository = Depends(deps.get_task_repository),
         current_user: User = Depends(deps.get_current_user),
     ) -> Any:
-        task = await self.service.update_task(db, id, current_user.id, task_in)
-        if not task:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Task with id {id} not found"
+        async def operation():
+            task = await self.service.update_task(repository, id, current_user.id, task_in)
+            if not task:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Task with id {id} not found"
+                )
+
+            return Envelope[TaskSchema](
+                data=task,
+                meta=Meta(request_id=getattr(request.state, "request_id", None))
             )
-        
-        return Envelope(
-            data=task,
-            meta=Meta(request_id=getattr(request.state, "request_id", None))
+
+        return await self._idempotent(
+            request, idempotency, current_user, status.HTTP_200_OK, operation
         )
 
     async def delete_task(
         self,
+        request: Request,
         id: int,
-        db: AsyncSession = Depends(get_db),
+        idempotency: IdempotencyRepository = Depends(deps.get_idempotency_repository),
+        repository: TaskRepository = Depends(deps.get_task_repository),
         current_user: User = Depends(deps.get_current_user),
     ) -> Response:
-        deleted = await self.service.delete_task(db, id, current_user.id)
-        if not deleted:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Task with id {id} not found"
-            )
-        
-        return Response(status_code=status.HTTP_204_NO_CONTENT)
+        async def operation():
+            deleted = await self.service.delete_task(repository, id, current_user.id)
+            if not deleted:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Task with id {id} not found"
+                )
+            return None
+
+        return await self._idempotent(
+            request, idempotency, current_user, status.HTTP_204_NO_CONTENT, operation
+        )
@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from app.api.v1.controllers.health_controller import HealthController
+from app.schemas.response import Envelope
+
+router = APIRouter()
+health_controller = HealthController()
+
+router.get("/live", response_model=Envelope[dict])(health_controller.liveness)
+router.get("/ready", response_model=Envelope[dict])(health_controller.readiness)
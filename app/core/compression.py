@@ -0,0 +1,217 @@
+import asyncio
+import zlib
+from typing import Callable, Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional: pip install brotli
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install zstandard
+    zstandard = None
+
+
+# Compressible media types -> level per encoding. API responses are compressed
+# per request, so levels favour speed; zstd and brotli reach gzip-6 ratios at
+# lower levels.
+CONTENT_TYPE_LEVELS: Dict[str, Dict[str, int]] = {
+    "application/json": {"zstd": 3, "br": 4, "gzip": 6},
+    "application/problem+json": {"zstd": 3, "br": 4, "gzip": 6},
+    "application/x-ndjson": {"zstd": 3, "br": 4, "gzip": 5},
+    "text/csv": {"zstd": 3, "br": 4, "gzip": 5},
+    "text/plain": {"zstd": 3, "br": 4, "gzip": 6},
+    # Swagger / ReDoc pages and assets are cacheable, so spend more CPU on them
+    "text/html": {"zstd": 9, "br": 9, "gzip": 9},
+    "text/css": {"zstd": 9, "br": 9, "gzip": 9},
+    "application/javascript": {"zstd": 9, "br": 9, "gzip": 9},
+}
+
+
+class _Compressor:
+    """Incremental compressor: `compress` returns what is ready, `finish` the rest."""
+
+    def __init__(self, compress: Callable[[bytes], bytes], finish: Callable[[], bytes]):
+        self.compress = compress
+        self.finish = finish
+
+
+def _gzip(level: int) -> _Compressor:
+    obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return _Compressor(obj.compress, obj.flush)
+
+
+def _brotli(level: int) -> _Compressor:
+    obj = brotli.Compressor(quality=level)
+    return _Compressor(obj.process, obj.finish)
+
+
+def _zstd(level: int) -> _Compressor:
+    obj = zstandard.ZstdCompressor(level=level).compressobj()
+    return _Compressor(obj.compress, obj.flush)
+
+
+# In order of preference when the client accepts several with the same q-value
+ENCODERS: Dict[str, Callable[[int], _Compressor]] = {}
+if zstandard is not None:
+    ENCODERS["zstd"] = _zstd
+if brotli is not None:
+    ENCODERS["br"] = _brotli
+ENCODERS["gzip"] = _gzip
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the supported encoding with the highest q-value from an Accept-Encoding header."""
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+
+    best, best_q = None, 0.0
+    for name in ENCODERS:
+        q = accepted.get(name, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compress responses according to `Accept-Encoding` (zstd, br, gzip).
+
+    Pure ASGI so that streaming responses are compressed chunk by chunk:
+
+    - Only media types listed in `CONTENT_TYPE_LEVELS` are compressed, at the
+      level configured for the type and encoding
+    - Bodies are buffered until `COMPRESSION_MIN_SIZE` bytes; responses that
+      end before that are sent as they are
+    - A complete body gets a new `Content-Length`; a streaming body drops it
+      and is compressed incrementally, never held in memory whole
+    - Chunks of `COMPRESSION_OFFLOAD_SIZE` bytes or more are compressed in a
+      worker thread (zlib, brotli and zstd release the GIL) so large pages
+      don't stall the event loop
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: Optional[int] = None,
+        offload_size: Optional[int] = None,
+    ):
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        self.offload_size = settings.COMPRESSION_OFFLOAD_SIZE if offload_size is None else offload_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(send, encoding, self.minimum_size, self.offload_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send: Send, encoding: str, minimum_size: int, offload_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.offload_size = offload_size
+        self.start_message: Optional[Message] = None
+        self.level: Optional[int] = None
+        self.buffer: List[bytes] = []
+        self.buffered = 0
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            self.level = self.compression_level(Headers(raw=message["headers"]), message["status"])
+            self.passthrough = self.level is None
+            if self.passthrough:
+                await self._send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is not None:
+            await self.send_compressed(body, more_body)
+            return
+
+        self.buffer.append(body)
+        self.buffered += len(body)
+        if self.buffered < self.minimum_size:
+            if more_body:
+                return
+            # Too small to be worth it
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": b"".join(self.buffer)})
+            return
+
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        self.compressor = ENCODERS[self.encoding](self.level)
+        data = b"".join(self.buffer)
+        self.buffer = []
+
+        if not more_body:
+            # Whole body known: compress it in one go and send a real length
+            compressed = await self.run(self.compress_all, data)
+            headers["Content-Length"] = str(len(compressed))
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": compressed})
+            return
+
+        # Streaming: the final length is unknown
+        del headers["Content-Length"]
+        await self._send(self.start_message)
+        await self.send_compressed(data, more_body=True)
+
+    async def send_compressed(self, body: bytes, more_body: bool) -> None:
+        chunk = await self.run(self.compressor.compress, body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+        if chunk or not more_body:
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def compress_all(self, data: bytes) -> bytes:
+        return self.compressor.compress(data) + self.compressor.finish()
+
+    async def run(self, fn: Callable[[bytes], bytes], data: bytes) -> bytes:
+        if len(data) >= self.offload_size:
+            return await asyncio.to_thread(fn, data)
+        return fn(data)
+
+    def compression_level(self, headers: Headers, status_code: int) -> Optional[int]:
+        if status_code < 200 or status_code in (204, 304) or "content-encoding" in headers:
+            return None
+        media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        levels = CONTENT_TYPE_LEVELS.get(media_type)
+        if levels is None:
+            return None
+        return levels[self.encoding]
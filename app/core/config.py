@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import List, Literal, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Technical Test API"
@@ -24,6 +24,116 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Rate limiting (token buckets: capacity = burst, refill in tokens per second)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_STORE: str = "memory"
+    RATE_LIMIT_MAX_BUCKETS: int = 100_000
+    RATE_LIMIT_IDLE_TTL_SECONDS: int = 600
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+    RATE_LIMIT_LOGIN_IP_BURST: int = 10
+    RATE_LIMIT_LOGIN_IP_PER_MINUTE: int = 10
+    RATE_LIMIT_TASKS_USER_BURST: int = 60
+    RATE_LIMIT_TASKS_USER_PER_MINUTE: int = 300
+    RATE_LIMIT_TASKS_IP_BURST: int = 120
+    RATE_LIMIT_TASKS_IP_PER_MINUTE: int = 600
+
+    # Load shedding (adaptive concurrency limit)
+    LOAD_SHED_ENABLED: bool = True
+    LOAD_SHED_INITIAL_LIMIT: int = 20
+    LOAD_SHED_MIN_LIMIT: int = 4
+    LOAD_SHED_MAX_LIMIT: int = 200
+    LOAD_SHED_TARGET_LATENCY_MS: int = 250
+    LOAD_SHED_BACKOFF_RATIO: float = 0.9
+    LOAD_SHED_RETRY_AFTER_SECONDS: int = 1
+
+    # Health checks
+    HEALTH_DB_TIMEOUT_SECONDS: float = 2.0
+
+    # Background jobs
+    BACKGROUND_JOBS_ENABLED: bool = True
+
+    # Idempotency keys
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS: int = 60
+    IDEMPOTENCY_WAIT_TIMEOUT_SECONDS: float = 10.0
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: int = 300
+    IDEMPOTENCY_PURGE_BATCH_SIZE: int = 1000
+
+    # Archival of soft-deleted tasks
+    TASK_ARCHIVE_ENABLED: bool = True
+    TASK_ARCHIVE_AFTER_DAYS: int = 30
+    TASK_ARCHIVE_BATCH_SIZE: int = 500
+    TASK_ARCHIVE_BATCH_PAUSE_SECONDS: float = 0.1
+    TASK_ARCHIVE_INTERVAL_SECONDS: int = 3600
+
+    # Transactional outbox: task writes enqueue side-effect jobs in the same
+    # transaction; OUTBOX_WORKERS claim loops per process run them, with at
+    # most OUTBOX_CONCURRENCY handlers in flight. Loops claim at most
+    # OUTBOX_BATCH_SIZE jobs and never more than the free handler slots, so a
+    # claimed job starts at once. It is leased for OUTBOX_LEASE_SECONDS, which
+    # must cover OUTBOX_HANDLER_TIMEOUT_SECONDS plus recording the outcome,
+    # and becomes claimable again if its worker dies.
+    OUTBOX_ENABLED: bool = True
+    OUTBOX_WORKER_ENABLED: bool = True
+    OUTBOX_WORKERS: int = 2
+    OUTBOX_CONCURRENCY: int = 10
+    OUTBOX_BATCH_SIZE: int = 50
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    OUTBOX_HANDLER_TIMEOUT_SECONDS: float = 30.0
+    OUTBOX_LEASE_SECONDS: int = 60
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_RETRY_BASE_SECONDS: float = 1.0
+    OUTBOX_RETRY_MAX_SECONDS: float = 300.0
+    OUTBOX_METRICS_INTERVAL_SECONDS: int = 15
+
+    # Default number of hash partitions for app.jobs.partition_tasks
+    TASKS_PARTITION_COUNT: int = 16
+
+    # Response compression (zstd / br need the optional zstandard / brotli packages)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    # Chunks at least this large are compressed in a worker thread
+    COMPRESSION_OFFLOAD_SIZE: int = 64 * 1024
+
+    # Logging: records go through a queue to a background writer thread
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["json", "text"] = "json"
+    LOG_ACCESS_ENABLED: bool = True
+    LOG_QUEUE_SIZE: int = 10_000
+    # At most LOG_EXCEPTION_BURST identical exceptions are logged per window
+    LOG_EXCEPTION_BURST: int = 5
+    LOG_EXCEPTION_WINDOW_SECONDS: float = 60.0
+
+    # On-demand request profiling
+    PROFILING_ENABLED: bool = False
+    PROFILING_SECRET: Optional[str] = None
+    PROFILING_ALLOWED_USERS: List[str] = []
+    PROFILING_SAMPLE_RATE: float = 1.0
+    PROFILING_MODE: Literal["sampling", "deterministic"] = "sampling"
+    PROFILING_FORMAT: Literal["speedscope", "collapsed"] = "speedscope"
+    PROFILING_INTERVAL_MS: float = 1.0
+    PROFILING_OUTPUT_DIR: str = "/tmp/profiles"
+
+    # Storage behind TaskService / AuthService: "sqlalchemy" (Postgres) or
+    # "memory" (process-local, no I/O; for tests and API-layer benchmarks)
+    STORAGE_BACKEND: Literal["sqlalchemy", "memory"] = "sqlalchemy"
+
+    # Server (app.server): workers default to the CPU count. DB_CONNECTION_BUDGET
+    # is the total number of connections all workers may open; each worker's
+    # DB_POOL_SIZE / DB_MAX_OVERFLOW are derived from it unless set explicitly,
+    # keeping connections for the worker's background jobs out of the share
+    # left to requests.
+    WEB_CONCURRENCY: Optional[int] = None
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30
+    DB_CONNECTION_BUDGET: int = 80
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    # Connections each worker opens at startup (capped at DB_POOL_SIZE)
+    DB_POOL_WARM_CONNECTIONS: int = 2
+
     # First Superuser
     FIRST_SUPERUSER: str = "admin@example.com"
     FIRST_SUPERUSER_PASSWORD: str = "changeme"
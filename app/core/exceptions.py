@@ -1,5 +1,5 @@
 import logging
-from typing import Union
+from typing import Dict, Optional, Union
 from fastapi import Request, status
 from fastapi.exceptions import RequestValidationError, HTTPException
 from fastapi.responses import JSONResponse
@@ -9,42 +9,63 @@ from app.schemas.error import ProblemDetails, FieldError
 
 logger = logging.getLogger(__name__)
 
+# Map status codes to error types
+ERROR_TYPE_MAP = {
+    400: "bad-request",
+    401: "unauthorized",
+    403: "forbidden",
+    404: "not-found",
+    409: "conflict",
+    422: "validation-error",
+    429: "rate-limit-exceeded",
+    503: "service-unavailable",
+}
+
 def get_request_id(request: Request) -> str:
     """Extract request ID from request state."""
     return getattr(request.state, "request_id", "unknown")
 
-async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
+def problem_response(
+    request: Request,
+    status_code: int,
+    title: str,
+    detail: str,
+    headers: Optional[Dict[str, str]] = None,
+) -> JSONResponse:
     """
-    Handle HTTPException and convert to RFC 7807 Problem Details format.
+    Build an RFC 7807 Problem Details response.
+
+    Used by middleware that short-circuits requests before they reach the
+    router, where raising HTTPException would bypass the exception handlers.
     """
-    request_id = get_request_id(request)
-    
-    # Map status codes to error types
-    error_type_map = {
-        400: "bad-request",
-        401: "unauthorized",
-        403: "forbidden",
-        404: "not-found",
-        409: "conflict",
-        422: "validation-error",
-        429: "rate-limit-exceeded",
-    }
-    
-    error_type = error_type_map.get(exc.status_code, "error")
+    error_type = ERROR_TYPE_MAP.get(status_code, "error")
     base_url = str(request.base_url).rstrip("/")
-    
+
     problem = ProblemDetails(
         type=f"{base_url}/errors/{error_type}",
-        title=exc.detail if isinstance(exc.detail, str) else "HTTP Error",
-        status=exc.status_code,
-        detail=str(exc.detail),
+        title=title,
+        status=status_code,
+        detail=detail,
         instance=str(request.url.path),
-        request_id=request_id,
+        request_id=get_request_id(request),
     )
-    
+
     return JSONResponse(
-        status_code=exc.status_code,
+        status_code=status_code,
         content=problem.model_dump(exclude_none=True),
+        headers=headers,
+    )
+
+async def http_exception_handler(request: Request, exc: HTTPException) -> JSONResponse:
+    """
+    Handle HTTPException and convert to RFC 7807 Problem Details format.
+    """
+    return problem_response(
+        request,
+        status_code=exc.status_code,
+        title=exc.detail if isinstance(exc.detail, str) else "HTTP Error",
+        detail=str(exc.detail),
+        headers=getattr(exc, "headers", None),
     )
 
 async def validation_exception_handler(
@@ -90,10 +111,14 @@ async def generic_exception_handler(request: Request, exc: Exception) -> JSONRes
     request_id = get_request_id(request)
     base_url = str(request.base_url).rstrip("/")
     
-    # Log the full exception with stacktrace
+    # Log the full exception with stacktrace. Formatting (message and
+    # traceback) happens on the logging thread, and repeated identical
+    # exceptions are rate-limited (see app.core.logging_config)
     logger.error(
-        f"Unhandled exception for request {request_id}: {exc}",
-        exc_info=True,
+        "Unhandled exception for request %s: %r",
+        request_id,
+        exc,
+        exc_info=exc,
         extra={"request_id": request_id, "path": request.url.path}
     )
     
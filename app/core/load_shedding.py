@@ -0,0 +1,180 @@
+import enum
+import time
+from typing import Optional
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.config import settings
+from app.core.exceptions import problem_response
+
+
+class Priority(enum.IntEnum):
+    LOW = 0
+    NORMAL = 1
+    HIGH = 2
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency limiter.
+
+    Tracks in-flight requests against a limit that adapts to observed latency:
+    every request completing under `target_latency` while the limiter is in use
+    grows the limit by roughly one per window (additive increase), and a slow
+    or failed request shrinks it by `backoff_ratio` (multiplicative decrease).
+    The decrease is applied at most once per window: only a request that
+    started after the previous decrease can trigger the next one, so a burst
+    of requests that were slow together counts as one congestion signal.
+    Lower priorities may only use a share of the limit, so cheap requests keep
+    being served when heavy ones are shed.
+    """
+
+    PRIORITY_SHARE = {
+        Priority.LOW: 0.7,
+        Priority.NORMAL: 0.9,
+        Priority.HIGH: 1.0,
+    }
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 4,
+        max_limit: int = 200,
+        target_latency: float = 0.25,
+        backoff_ratio: float = 0.9,
+        smoothing: float = 0.2,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.backoff_ratio = backoff_ratio
+        self.smoothing = smoothing
+
+        self._limit = float(initial_limit)
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self.last_decrease = float("-inf")
+        self.accepted = 0
+        self.rejected = 0
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def try_acquire(self, priority: Priority = Priority.NORMAL) -> bool:
+        allowed = max(1, int(self._limit * self.PRIORITY_SHARE[priority]))
+        if self.in_flight >= allowed:
+            self.rejected += 1
+            return False
+        self.in_flight += 1
+        self.accepted += 1
+        return True
+
+    def release(
+        self,
+        latency: float,
+        failed: bool = False,
+        sample: bool = True,
+        now: Optional[float] = None,
+    ) -> None:
+        """
+        Return a slot. With `sample=False` the latency is not used to adapt the
+        limit (for requests that are slow by design); failures still count.
+        """
+        # Compare against the limit before this request left to decide whether
+        # the limiter was actually the bottleneck.
+        saturated = self.in_flight * 2 >= self._limit
+        self.in_flight -= 1
+        now = time.monotonic() if now is None else now
+
+        if sample:
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma += self.smoothing * (latency - self.latency_ewma)
+
+        if failed or (sample and latency > self.target_latency):
+            if now - latency >= self.last_decrease:
+                self._limit = max(self.min_limit, self._limit * self.backoff_ratio)
+                self.last_decrease = now
+        elif sample and saturated:
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "latency_ewma_ms": round(self.latency_ewma * 1000, 2) if self.latency_ewma is not None else None,
+            "target_latency_ms": round(self.target_latency * 1000, 2),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+        }
+
+
+concurrency_limiter = AdaptiveConcurrencyLimiter(
+    initial_limit=settings.LOAD_SHED_INITIAL_LIMIT,
+    min_limit=settings.LOAD_SHED_MIN_LIMIT,
+    max_limit=settings.LOAD_SHED_MAX_LIMIT,
+    target_latency=settings.LOAD_SHED_TARGET_LATENCY_MS / 1000,
+    backoff_ratio=settings.LOAD_SHED_BACKOFF_RATIO,
+)
+
+
+class LoadSheddingMiddleware(BaseHTTPMiddleware):
+    """
+    Reject requests with 503 once the adaptive concurrency limit is reached.
+
+    - Health probes are never shed
+    - `/` is high priority; task listing and login are low priority
+    - Shed requests get a Problem Details body with `Retry-After`
+    - Unhandled exceptions and 5xx responses count as congestion signals
+    - Login latency is not sampled: password hashing is slow by design and
+      would otherwise keep shrinking the limit
+    """
+
+    def __init__(self, app, limiter: Optional[AdaptiveConcurrencyLimiter] = None):
+        super().__init__(app)
+        self.limiter = limiter or concurrency_limiter
+        self.login_path = f"{settings.API_V1_STR}/auth/login"
+        self.tasks_list_path = f"{settings.API_V1_STR}/tasks/"
+
+    def get_priority(self, request: Request) -> Optional[Priority]:
+        path = request.url.path
+        if path.startswith("/health"):
+            return None
+        if path == "/":
+            return Priority.HIGH
+        if path == self.login_path:
+            return Priority.LOW
+        if request.method == "GET" and path.rstrip("/") == self.tasks_list_path.rstrip("/"):
+            return Priority.LOW
+        return Priority.NORMAL
+
+    async def dispatch(self, request: Request, call_next):
+        priority = self.get_priority(request)
+        if priority is None:
+            return await call_next(request)
+
+        if not self.limiter.try_acquire(priority):
+            return problem_response(
+                request,
+                status_code=503,
+                title="Service Unavailable",
+                detail="The server is overloaded. Please retry later.",
+                headers={"Retry-After": str(settings.LOAD_SHED_RETRY_AFTER_SECONDS)},
+            )
+
+        start = time.monotonic()
+        failed = True
+        try:
+            response: Response = await call_next(request)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            self.limiter.release(
+                time.monotonic() - start,
+                failed=failed,
+                sample=request.url.path != self.login_path,
+            )
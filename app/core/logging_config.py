@@ -0,0 +1,183 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+
+# Set by RequestIDMiddleware; every record logged while handling the request
+# carries it, including records from services and the exception handlers
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[logging.Handler] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: timestamp, level, logger, message, request_id, extras and the traceback."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_type"] = record.exc_info[0].__name__
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hand records to the listener thread without formatting them.
+
+    The stock QueueHandler renders the message and traceback in `prepare()`,
+    i.e. on the event loop. Here the record is only tagged with the current
+    request ID (contextvars are not visible from the listener thread) and
+    formatting happens in the listener. When the queue is full the record is
+    dropped and counted instead of blocking the loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # The count is reset only once a record carrying it got through
+        if self.dropped:
+            record.dropped_records = self.dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        else:
+            self.dropped = 0
+
+
+class RepeatedExceptionFilter(logging.Filter):
+    """
+    Rate-limit identical exceptions.
+
+    Exceptions are identical when they have the same type and were raised from
+    the same line. At most `burst` of them are logged per `window` seconds; the
+    rest are dropped and the first record logged after the window carries a
+    `suppressed` count.
+    """
+
+    def __init__(self, burst: int, window: float):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self._lock = threading.Lock()
+        # key -> (window_started, logged_in_window, suppressed)
+        self._seen: Dict[Tuple, Tuple[float, int, int]] = {}
+
+    @staticmethod
+    def exception_key(exc_info) -> Tuple:
+        exc_type, _, tb = exc_info
+        while tb is not None and tb.tb_next is not None:
+            tb = tb.tb_next
+        if tb is None:
+            return (exc_type, None, None)
+        return (exc_type, tb.tb_frame.f_code.co_filename, tb.tb_lineno)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not record.exc_info or record.exc_info[0] is None:
+            return True
+
+        key = self.exception_key(record.exc_info)
+        now = time.monotonic()
+        with self._lock:
+            started, logged, suppressed = self._seen.get(key, (now, 0, 0))
+            if now - started >= self.window:
+                started, logged = now, 0
+            if logged >= self.burst:
+                self._seen[key] = (started, logged, suppressed + 1)
+                return False
+            self._seen[key] = (started, logged + 1, 0)
+            if len(self._seen) > 1000:
+                self._seen.clear()
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+def setup_logging() -> bool:
+    """
+    Route all logging through a queue drained by a background thread.
+
+    Safe to call more than once; only the first call configures logging and
+    returns True, so the caller that started the listener is the one that
+    stops it with `shutdown_logging()`.
+    """
+    global _listener, _handler
+    if _listener is not None:
+        return False
+
+    output = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        output.setFormatter(JSONFormatter())
+    else:
+        output.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s]: %(message)s"
+        ))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(RepeatedExceptionFilter(
+        settings.LOG_EXCEPTION_BURST, settings.LOG_EXCEPTION_WINDOW_SECONDS
+    ))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(settings.LOG_LEVEL)
+    # uvicorn installs its own stream handlers; send its records through the queue too
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    _handler = handler
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return True
+
+
+def shutdown_logging() -> None:
+    """
+    Flush queued records and stop the listener thread.
+
+    The queue handler is removed as well, so records logged afterwards are
+    not left in a queue nobody drains.
+    """
+    global _listener, _handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
@@ -1,26 +1,57 @@
+import logging
+import time
 import uuid
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
 
+from app.core.config import settings
+from app.core.logging_config import request_id_var
+
+access_logger = logging.getLogger("app.access")
+
 class RequestIDMiddleware(BaseHTTPMiddleware):
     """
     Middleware to add a unique request ID to each request.
     
     - Accepts X-Request-ID header from client or generates a new UUID
     - Stores request_id in request.state for access in handlers
+    - Sets it in `request_id_var` so every log record of the request carries it
     - Adds X-Request-ID to response headers
+    - Writes one access log record per request with its duration
     """
     
     async def dispatch(self, request: Request, call_next):
+        started = time.perf_counter()
+
         # Get or generate request ID
         request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
         
         # Store in request state for access in handlers
         request.state.request_id = request_id
+        # Each request runs in its own task, so this doesn't leak between
+        # requests; it is left set for the outer exception handlers
+        request_id_var.set(request_id)
         
         # Process request
-        response: Response = await call_next(request)
+        status_code = 500
+        try:
+            response: Response = await call_next(request)
+            status_code = response.status_code
+        finally:
+            if settings.LOG_ACCESS_ENABLED:
+                duration_ms = (time.perf_counter() - started) * 1000
+                access_logger.info(
+                    "%s %s %d %.1fms",
+                    request.method, request.url.path, status_code, duration_ms,
+                    extra={
+                        "method": request.method,
+                        "path": request.url.path,
+                        "status_code": status_code,
+                        "duration_ms": round(duration_ms, 2),
+                        "client": request.client.host if request.client else None,
+                    },
+                )
         
         # Add request ID to response headers
         response.headers["X-Request-ID"] = request_id
@@ -0,0 +1,186 @@
+import asyncio
+import cProfile
+import hmac
+import json
+import os
+import random
+import sys
+import threading
+from collections import Counter
+from typing import Tuple
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core import security
+from app.core.config import settings
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+class StackSampler:
+    """
+    Wall-clock sampling profiler for one thread.
+
+    A daemon thread snapshots the target thread's Python stack every
+    `interval` seconds via `sys._current_frames()`. The target thread pays
+    nothing beyond GIL handoffs, so sampling is cheap enough for production.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+    @staticmethod
+    def _frame_label(frame: Tuple[str, str, int]) -> str:
+        name, filename, line = frame
+        return f"{name} ({filename}:{line})"
+
+    def to_collapsed(self) -> str:
+        """Brendan Gregg's folded format, one `frame;frame;frame count` line per stack."""
+        return "\n".join(
+            f"{';'.join(self._frame_label(frame) for frame in stack)} {count}"
+            for stack, count in self.samples.most_common()
+        ) + "\n"
+
+    def to_speedscope(self, name: str) -> str:
+        frames = []
+        frame_index = {}
+        samples = []
+        weights = []
+        for stack, count in self.samples.items():
+            indexes = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indexes.append(frame_index[frame])
+            samples.append(indexes)
+            weights.append(count * self.interval * 1000)
+
+        total = sum(weights)
+        return json.dumps({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": total,
+                "samples": samples,
+                "weights": weights,
+            }],
+            "exporter": settings.PROJECT_NAME,
+        })
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    """
+    Profile individual requests on demand.
+
+    - A request is eligible when it sends `X-Profile` and either the header
+      value matches `PROFILING_SECRET` or its bearer token belongs to one of
+      `PROFILING_ALLOWED_USERS`
+    - Only `PROFILING_SAMPLE_RATE` of eligible requests are profiled, and at
+      most one at a time per worker
+    - The profile is written to `PROFILING_OUTPUT_DIR/<X-Request-ID>.<ext>`
+      and the response carries `X-Profile-Id`
+
+    Both profilers observe the whole event loop thread, so concurrent requests
+    on the same worker show up in the profile too.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self._busy = False
+
+    def is_authorized(self, request: Request) -> bool:
+        value = request.headers.get(PROFILE_HEADER)
+        if value is None:
+            return False
+        # compare_digest only accepts ASCII str; compare the raw header bytes
+        # (Starlette decodes header values as latin-1) with the UTF-8 secret
+        if settings.PROFILING_SECRET and hmac.compare_digest(
+            value.encode("latin-1"), settings.PROFILING_SECRET.encode()
+        ):
+            return True
+        if settings.PROFILING_ALLOWED_USERS:
+            subject = security.get_request_subject(request)
+            return subject is not None and subject in settings.PROFILING_ALLOWED_USERS
+        return False
+
+    async def dispatch(self, request: Request, call_next):
+        if (
+            self._busy
+            or not self.is_authorized(request)
+            or random.random() >= settings.PROFILING_SAMPLE_RATE
+        ):
+            return await call_next(request)
+
+        request_id = getattr(request.state, "request_id", None) or "unknown"
+        self._busy = True
+        try:
+            if settings.PROFILING_MODE == "deterministic":
+                profiler = cProfile.Profile()
+                profiler.enable()
+                try:
+                    response: Response = await call_next(request)
+                finally:
+                    profiler.disable()
+                path = self.output_path(request_id, "pstats")
+                await asyncio.to_thread(profiler.dump_stats, path)
+            else:
+                sampler = StackSampler(threading.get_ident(), settings.PROFILING_INTERVAL_MS / 1000)
+                sampler.start()
+                try:
+                    response = await call_next(request)
+                finally:
+                    sampler.stop()
+                if settings.PROFILING_FORMAT == "collapsed":
+                    path = self.output_path(request_id, "collapsed.txt")
+                    content = sampler.to_collapsed()
+                else:
+                    path = self.output_path(request_id, "speedscope.json")
+                    content = sampler.to_speedscope(f"{request.method} {request.url.path}")
+                await asyncio.to_thread(self.write, path, content)
+        finally:
+            self._busy = False
+
+        response.headers[PROFILE_ID_HEADER] = request_id
+        return response
+
+    @staticmethod
+    def output_path(request_id: str, extension: str) -> str:
+        # Request IDs may come from clients; keep only filename-safe characters
+        safe_id = "".join(c for c in request_id if c.isalnum() or c in "-_")[:64] or "unknown"
+        os.makedirs(settings.PROFILING_OUTPUT_DIR, exist_ok=True)
+        return os.path.join(settings.PROFILING_OUTPUT_DIR, f"{safe_id}.{extension}")
+
+    @staticmethod
+    def write(path: str, content: str) -> None:
+        with open(path, "w") as fh:
+            fh.write(content)
@@ -0,0 +1,224 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core import security
+from app.core.config import settings
+from app.core.exceptions import problem_response
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """A token bucket definition: `capacity` tokens, refilled at `refill_rate` tokens/second."""
+    name: str
+    capacity: int
+    refill_rate: float
+
+    @classmethod
+    def per_minute(cls, name: str, burst: int, per_minute: int) -> "RateLimitRule":
+        return cls(name=name, capacity=burst, refill_rate=per_minute / 60.0)
+
+
+@dataclass
+class BucketState:
+    """Result of consuming from a bucket."""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float
+
+
+class RateLimitStore(ABC):
+    """
+    Storage backend for token buckets.
+
+    Implementations must apply `consume_all` atomically over its keys: tokens
+    are only taken when every bucket allows the request, so a request rejected
+    by one bucket does not spend the others. The in-memory store is the local
+    stand-in; a shared store (e.g. Redis running the same refill arithmetic in
+    a Lua script) lets several workers enforce one limit.
+    """
+
+    @abstractmethod
+    async def consume_all(
+        self, buckets: Sequence[Tuple[str, RateLimitRule]], cost: int = 1
+    ) -> List[BucketState]:
+        """Take `cost` tokens from every bucket, or from none if any would be exceeded."""
+
+    async def consume(self, key: str, rule: RateLimitRule, cost: int = 1) -> BucketState:
+        return (await self.consume_all([(key, rule)], cost))[0]
+
+    async def close(self) -> None:
+        return None
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """
+    Process-local token bucket store.
+
+    Buckets live in an OrderedDict kept in least-recently-used order, so lookup,
+    update and eviction are all O(1). Buckets idle for longer than `idle_ttl`
+    are dropped from the cold end on every call, and the store never holds more
+    than `max_buckets` entries.
+    """
+
+    def __init__(self, max_buckets: int = 100_000, idle_ttl: float = 600.0):
+        self.max_buckets = max_buckets
+        self.idle_ttl = idle_ttl
+        # key -> (tokens, last_refill_timestamp)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while buckets:
+            oldest_key = next(iter(buckets))
+            _, last_seen = buckets[oldest_key]
+            if now - last_seen < self.idle_ttl and len(buckets) <= self.max_buckets:
+                break
+            buckets.popitem(last=False)
+
+    async def consume_all(
+        self, buckets: Sequence[Tuple[str, RateLimitRule]], cost: int = 1
+    ) -> List[BucketState]:
+        now = time.monotonic()
+        refilled = []
+        for key, rule in buckets:
+            bucket = self._buckets.pop(key, None)
+            if bucket is None:
+                tokens = float(rule.capacity)
+            else:
+                tokens, last = bucket
+                tokens = min(float(rule.capacity), tokens + (now - last) * rule.refill_rate)
+            refilled.append((key, rule, tokens))
+
+        allowed = all(tokens >= cost for _, _, tokens in refilled)
+        states = []
+        for key, rule, tokens in refilled:
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            states.append(_bucket_state(rule, tokens, cost, allowed or tokens >= cost))
+        # After the keys are back at the hot end, so the cap holds afterwards
+        self._evict(now)
+        return states
+
+
+def _bucket_state(rule: RateLimitRule, tokens: float, cost: int, allowed: bool) -> BucketState:
+    missing = rule.capacity - tokens
+    reset_after = missing / rule.refill_rate if rule.refill_rate > 0 else 0.0
+    retry_after = 0.0
+    if not allowed:
+        retry_after = (cost - tokens) / rule.refill_rate if rule.refill_rate > 0 else float("inf")
+
+    return BucketState(
+        allowed=allowed,
+        limit=rule.capacity,
+        remaining=int(tokens),
+        reset_after=reset_after,
+        retry_after=retry_after,
+    )
+
+
+def create_rate_limit_store() -> RateLimitStore:
+    if settings.RATE_LIMIT_STORE == "memory":
+        return InMemoryRateLimitStore(
+            max_buckets=settings.RATE_LIMIT_MAX_BUCKETS,
+            idle_ttl=settings.RATE_LIMIT_IDLE_TTL_SECONDS,
+        )
+    raise ValueError(f"Unknown RATE_LIMIT_STORE: {settings.RATE_LIMIT_STORE!r}")
+
+
+LOGIN_IP_RULE = RateLimitRule.per_minute(
+    "login-ip", settings.RATE_LIMIT_LOGIN_IP_BURST, settings.RATE_LIMIT_LOGIN_IP_PER_MINUTE
+)
+TASKS_USER_RULE = RateLimitRule.per_minute(
+    "tasks-user", settings.RATE_LIMIT_TASKS_USER_BURST, settings.RATE_LIMIT_TASKS_USER_PER_MINUTE
+)
+TASKS_IP_RULE = RateLimitRule.per_minute(
+    "tasks-ip", settings.RATE_LIMIT_TASKS_IP_BURST, settings.RATE_LIMIT_TASKS_IP_PER_MINUTE
+)
+
+
+def get_client_ip(request: Request) -> str:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("X-Forwarded-For")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimitMiddleware(BaseHTTPMiddleware):
+    """
+    Token-bucket rate limiting for the auth and tasks routes.
+
+    - `POST /auth/login` is limited per client IP
+    - Task routes are limited per user (JWT subject) and per client IP
+    - Every limited response carries `RateLimit-Limit`, `RateLimit-Remaining`
+      and `RateLimit-Reset`; rejected requests get a 429 Problem Details body
+      with `Retry-After`
+    """
+
+    def __init__(self, app, store: Optional[RateLimitStore] = None):
+        super().__init__(app)
+        self.store = store or create_rate_limit_store()
+        self.login_path = f"{settings.API_V1_STR}/auth/login"
+        self.tasks_prefix = f"{settings.API_V1_STR}/tasks"
+
+    def get_buckets(self, request: Request) -> List[Tuple[str, RateLimitRule]]:
+        path = request.url.path
+        if path == self.login_path:
+            return [(f"{LOGIN_IP_RULE.name}:{get_client_ip(request)}", LOGIN_IP_RULE)]
+
+        if path.startswith(self.tasks_prefix):
+            buckets = [(f"{TASKS_IP_RULE.name}:{get_client_ip(request)}", TASKS_IP_RULE)]
+            subject = security.get_request_subject(request)
+            if subject is not None:
+                buckets.insert(0, (f"{TASKS_USER_RULE.name}:{subject}", TASKS_USER_RULE))
+            return buckets
+
+        return []
+
+    async def dispatch(self, request: Request, call_next):
+        buckets = self.get_buckets(request)
+        if not buckets:
+            return await call_next(request)
+
+        # A rejecting bucket, otherwise the most restrictive one, decides the
+        # advertised headers. Nothing is consumed unless every bucket allows it.
+        states = await self.store.consume_all(buckets)
+        tightest = next(
+            (state for state in states if not state.allowed),
+            min(states, key=lambda state: state.remaining),
+        )
+
+        headers = {
+            "RateLimit-Limit": str(tightest.limit),
+            "RateLimit-Remaining": str(tightest.remaining),
+            "RateLimit-Reset": str(math.ceil(tightest.reset_after)),
+        }
+
+        if not tightest.allowed:
+            retry_after = max(1, math.ceil(tightest.retry_after))
+            headers["Retry-After"] = str(retry_after)
+            return problem_response(
+                request,
+                status_code=429,
+                title="Too Many Requests",
+                detail=f"Rate limit exceeded. Retry in {retry_after} seconds.",
+                headers=headers,
+            )
+
+        response: Response = await call_next(request)
+        response.headers.update(headers)
+        return response
@@ -1,7 +1,8 @@
 from datetime import datetime, timedelta
 from typing import Optional, Any, Union
-from jose import jwt
+from jose import jwt, JWTError
 from passlib.context import CryptContext
+from starlette.requests import HTTPConnection
 from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -16,6 +17,36 @@ def create_access_token(subject: Union[str, Any], expires_delta: Optional[timede
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def get_token_subject(token: str) -> Optional[str]:
+    """Return the `sub` claim of a valid access token, or None if it does not verify."""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    sub = payload.get("sub")
+    return str(sub) if sub is not None else None
+
+def get_bearer_subject(authorization: Optional[str]) -> Optional[str]:
+    """Return the token subject from an `Authorization: Bearer ...` header value, if valid."""
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return get_token_subject(token)
+
+def get_request_subject(request: HTTPConnection) -> Optional[str]:
+    """
+    Bearer token subject of `request`, decoded once per request.
+
+    The result is cached on `request.state`, which middlewares and
+    `deps.get_current_user` share, so the JWT is only verified once.
+    """
+    state = request.state
+    if not hasattr(state, "token_subject"):
+        state.token_subject = get_bearer_subject(request.headers.get("Authorization"))
+    return state.token_subject
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
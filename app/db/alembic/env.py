@@ -20,8 +20,9 @@ from app.db.base import Base
 config = context.config
 
 # Interpret the config file for Python logging.
-# This line sets up loggers basically.
-if config.config_file_name is not None:
+# This line sets up loggers basically. Callers that already configured
+# logging (app.db.migrate) opt out through config.attributes.
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # Overwrite sqlalchemy.url with the one from settings
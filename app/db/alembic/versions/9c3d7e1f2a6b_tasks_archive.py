@@ -0,0 +1,54 @@
+"""tasks_archive
+
+Revision ID: 9c3d7e1f2a6b
+Revises: 5b8e2f4a1c7d
+Create Date: 2026-10-18 11:03:17.502611
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c3d7e1f2a6b'
+down_revision: Union[str, Sequence[str], None] = '5b8e2f4a1c7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tasks_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('owner_id', sa.Integer(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('is_deleted', sa.Boolean(), nullable=False, server_default=sa.text('false')),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tasks_archive_owner_id'), 'tasks_archive', ['owner_id'], unique=False)
+    op.create_index(op.f('ix_tasks_archive_archived_at'), 'tasks_archive', ['archived_at'], unique=False)
+    op.create_index(op.f('ix_tasks_archive_created_at'), 'tasks_archive', ['created_at'], unique=False)
+    op.create_index(op.f('ix_tasks_archive_is_deleted'), 'tasks_archive', ['is_deleted'], unique=False)
+    # Lets the archive job find candidates without scanning the live rows
+    op.create_index(
+        'ix_tasks_archivable', 'tasks', ['id'], unique=False,
+        postgresql_where=sa.text('is_deleted')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_archivable', table_name='tasks')
+    op.drop_index(op.f('ix_tasks_archive_is_deleted'), table_name='tasks_archive')
+    op.drop_index(op.f('ix_tasks_archive_created_at'), table_name='tasks_archive')
+    op.drop_index(op.f('ix_tasks_archive_archived_at'), table_name='tasks_archive')
+    op.drop_index(op.f('ix_tasks_archive_owner_id'), table_name='tasks_archive')
+    op.drop_table('tasks_archive')
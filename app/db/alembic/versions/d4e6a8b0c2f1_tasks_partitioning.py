@@ -0,0 +1,50 @@
+"""tasks_partitioning
+
+Revision ID: d4e6a8b0c2f1
+Revises: 9c3d7e1f2a6b
+Create Date: 2026-10-18 12:41:05.883120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from app.db import partitioning
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e6a8b0c2f1'
+down_revision: Union[str, Sequence[str], None] = '9c3d7e1f2a6b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Covers the list query (owner, not deleted, newest first). Moving tasks
+    # onto a partitioned table is an explicit step, app.jobs.partition_tasks,
+    # so this revision does the same everywhere regardless of configuration.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_owner_active_created_at "
+            "ON tasks (owner_id, created_at DESC) WHERE NOT is_deleted"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    swapped = bind.execute(
+        sa.text("SELECT to_regclass(:name) IS NOT NULL"), {"name": partitioning.OLD_TABLE}
+    ).scalar()
+    if swapped:
+        raise RuntimeError(
+            f"tasks was already swapped to the partitioned table; the previous data is in "
+            f"{partitioning.OLD_TABLE} and has to be restored manually"
+        )
+
+    # Discard a move prepared by app.jobs.partition_tasks but not swapped yet
+    for statement in partitioning.drop_sync_trigger_sql():
+        op.execute(statement)
+    op.execute(f"DROP TABLE IF EXISTS {partitioning.SHADOW_TABLE}")
+    op.drop_index('ix_tasks_owner_active_created_at', table_name='tasks')
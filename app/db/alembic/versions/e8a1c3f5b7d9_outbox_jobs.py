@@ -0,0 +1,52 @@
+"""outbox_jobs
+
+Revision ID: e8a1c3f5b7d9
+Revises: d4e6a8b0c2f1
+Create Date: 2026-10-18 15:02:17.406331
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a1c3f5b7d9'
+down_revision: Union[str, Sequence[str], None] = 'd4e6a8b0c2f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbox_jobs',
+    sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+    sa.Column('topic', sa.String(length=100), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('is_deleted', sa.Boolean(), nullable=False, server_default=sa.text('false')),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_outbox_jobs_id'), 'outbox_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_outbox_jobs_created_at'), 'outbox_jobs', ['created_at'], unique=False)
+    op.create_index(op.f('ix_outbox_jobs_is_deleted'), 'outbox_jobs', ['is_deleted'], unique=False)
+    op.create_index(
+        'ix_outbox_jobs_pending', 'outbox_jobs', ['available_at', 'id'], unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_jobs_pending', table_name='outbox_jobs')
+    op.drop_index(op.f('ix_outbox_jobs_is_deleted'), table_name='outbox_jobs')
+    op.drop_index(op.f('ix_outbox_jobs_created_at'), table_name='outbox_jobs')
+    op.drop_index(op.f('ix_outbox_jobs_id'), table_name='outbox_jobs')
+    op.drop_table('outbox_jobs')
@@ -1,3 +1,6 @@
 from app.db.base_class import Base  # noqa
 from app.models.user import User  # noqa
 from app.models.task import Task  # noqa
+from app.models.idempotency_key import IdempotencyKey  # noqa
+from app.models.task_archive import TaskArchive  # noqa
+from app.models.outbox import OutboxJob  # noqa
@@ -0,0 +1,99 @@
+"""
+Run Alembic migrations once per deployment.
+
+Several containers (or server processes) may start at the same time, so the
+upgrade runs under a Postgres advisory lock: the first process migrates, the
+others wait for the lock and then find the schema already at head. When the
+database is already at head the check is a single `SELECT` and no lock is taken.
+
+    python -m app.db.migrate
+"""
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Set
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import pool, text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+# Arbitrary application-wide key for the advisory lock
+MIGRATION_LOCK_ID = 72_610_035
+LOCK_POLL_INTERVAL_SECONDS = 0.5
+
+
+def get_alembic_config() -> Config:
+    config = Config(str(ALEMBIC_INI))
+    # Keep our logging setup; env.py would otherwise reload it from alembic.ini
+    config.attributes["configure_logger"] = False
+    return config
+
+
+async def current_revisions(conn: AsyncConnection) -> Set[str]:
+    revisions = await conn.run_sync(
+        lambda sync_conn: set(MigrationContext.configure(sync_conn).get_current_heads())
+    )
+    # Don't sit idle in a transaction: CREATE INDEX CONCURRENTLY in a migration
+    # would wait for this snapshot to go away
+    await conn.rollback()
+    return revisions
+
+
+async def acquire_lock(conn: AsyncConnection) -> None:
+    # Poll with pg_try_advisory_lock instead of blocking in pg_advisory_lock: a
+    # backend waiting inside a statement holds a snapshot, and CREATE INDEX
+    # CONCURRENTLY in the migration being run would wait for it forever
+    while True:
+        result = await conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+        acquired = result.scalar()
+        await conn.commit()
+        if acquired:
+            return
+        await asyncio.sleep(LOCK_POLL_INTERVAL_SECONDS)
+
+
+async def upgrade_to_head() -> bool:
+    """Upgrade the database to head. Returns False when it already was."""
+    config = get_alembic_config()
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+    engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI, poolclass=pool.NullPool)
+    try:
+        async with engine.connect() as conn:
+            if await current_revisions(conn) == heads:
+                return False
+
+            started = time.perf_counter()
+            logger.info("Waiting for the migration lock")
+            await acquire_lock(conn)
+            try:
+                # Another process may have migrated while we were waiting
+                if await current_revisions(conn) == heads:
+                    return False
+                # env.py drives its own event loop, so run Alembic in a thread
+                await asyncio.to_thread(command.upgrade, config, "head")
+                logger.info("Migrated to %s in %.1fs", ", ".join(sorted(heads)), time.perf_counter() - started)
+                return True
+            finally:
+                await conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+                await conn.commit()
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if not asyncio.run(upgrade_to_head()):
+        logger.info("Database already at head")
+
+
+if __name__ == "__main__":
+    main()
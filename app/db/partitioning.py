@@ -0,0 +1,179 @@
+"""
+DDL for moving `tasks` onto a table partitioned by HASH (owner_id).
+
+Every task query filters on owner_id (reads through the prebuilt statements,
+ORM updates and deletes through the mapper identity, see app/models/task.py),
+so each one prunes to a single partition. Range partitioning on created_at is
+not offered: lookups by id cannot name a created_at and would scan every
+partition.
+
+The move is run by `python -m app.jobs.partition_tasks`, in steps that each
+can be re-run, so the application keeps serving traffic:
+
+1. `prepare` makes `tasks.owner_id` NOT NULL (it becomes part of the primary
+   key), creates `tasks_partitioned` next to `tasks` and installs a trigger
+   mirroring every write on `tasks` into it.
+2. `copy` copies the existing rows over in id-ordered batches.
+3. `swap` swaps the tables (and index/constraint names) inside one short
+   ACCESS EXCLUSIVE lock.
+"""
+from typing import List
+
+PARTITION_KEY = "owner_id"
+
+TASK_COLUMNS = (
+    "id", "title", "description", "status", "owner_id",
+    "created_at", "updated_at", "is_deleted", "deleted_at",
+)
+
+# Index suffixes shared by the live and partitioned table: ix_tasks_<suffix>
+INDEXES = {
+    "id": "(id)",
+    "title": "(title)",
+    "status": "(status)",
+    "created_at": "(created_at)",
+    "is_deleted": "(is_deleted)",
+    "archivable": "(id) WHERE is_deleted",
+    "owner_active_created_at": "(owner_id, created_at DESC) WHERE NOT is_deleted",
+}
+
+SHADOW_TABLE = "tasks_partitioned"
+OLD_TABLE = "tasks_unpartitioned"
+
+# Returns (tasks is partitioned, shadow table exists, shadow partition count,
+# tasks.owner_id is NOT NULL)
+STATE_SQL = f"""
+    SELECT
+        EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'tasks'::regclass),
+        to_regclass('{SHADOW_TABLE}') IS NOT NULL,
+        (SELECT count(*) FROM pg_inherits WHERE inhparent = to_regclass('{SHADOW_TABLE}')),
+        (SELECT attnotnull FROM pg_attribute
+         WHERE attrelid = 'tasks'::regclass AND attname = '{PARTITION_KEY}')
+"""
+
+COUNT_ORPHANS_SQL = f"SELECT count(*) FROM tasks WHERE {PARTITION_KEY} IS NULL"
+
+
+def set_owner_not_null_sql() -> List[str]:
+    """
+    Make the partition key NOT NULL without holding ACCESS EXCLUSIVE for a
+    full scan: the NOT VALID check is validated under a weaker lock, and
+    SET NOT NULL then relies on it instead of scanning.
+    """
+    return [
+        f"ALTER TABLE tasks ADD CONSTRAINT tasks_{PARTITION_KEY}_not_null "
+        f"CHECK ({PARTITION_KEY} IS NOT NULL) NOT VALID",
+        f"ALTER TABLE tasks VALIDATE CONSTRAINT tasks_{PARTITION_KEY}_not_null",
+        f"ALTER TABLE tasks ALTER COLUMN {PARTITION_KEY} SET NOT NULL",
+        f"ALTER TABLE tasks DROP CONSTRAINT tasks_{PARTITION_KEY}_not_null",
+    ]
+
+
+def create_partitioned_table_sql(partition_count: int) -> List[str]:
+    statements = [
+        f"""
+        CREATE TABLE {SHADOW_TABLE} (
+            id INTEGER NOT NULL DEFAULT nextval('tasks_id_seq'::regclass),
+            title VARCHAR NOT NULL,
+            description TEXT,
+            status VARCHAR,
+            owner_id INTEGER NOT NULL REFERENCES users (id),
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            is_deleted BOOLEAN NOT NULL DEFAULT false,
+            deleted_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT {SHADOW_TABLE}_pkey PRIMARY KEY (id, {PARTITION_KEY})
+        ) PARTITION BY HASH ({PARTITION_KEY})
+        """,
+    ]
+
+    for remainder in range(partition_count):
+        statements.append(
+            f"CREATE TABLE tasks_p{remainder} PARTITION OF {SHADOW_TABLE} "
+            f"FOR VALUES WITH (MODULUS {partition_count}, REMAINDER {remainder})"
+        )
+
+    for suffix, definition in INDEXES.items():
+        statements.append(f"CREATE INDEX ix_tasks_p_{suffix} ON {SHADOW_TABLE} {definition}")
+
+    return statements
+
+
+def create_sync_trigger_sql() -> List[str]:
+    key = PARTITION_KEY
+    columns = ", ".join(TASK_COLUMNS)
+    new_values = ", ".join(f"NEW.{column}" for column in TASK_COLUMNS)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in TASK_COLUMNS if column not in ("id", key))
+
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION tasks_partition_sync() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM {SHADOW_TABLE} WHERE id = OLD.id AND {key} = OLD.{key};
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO {SHADOW_TABLE} ({columns}) VALUES ({new_values})
+                ON CONFLICT (id, {key}) DO UPDATE SET {updates};
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS tasks_partition_sync ON tasks",
+        """
+        CREATE TRIGGER tasks_partition_sync
+        AFTER INSERT OR UPDATE OR DELETE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION tasks_partition_sync()
+        """,
+    ]
+
+
+def drop_sync_trigger_sql() -> List[str]:
+    return [
+        "DROP TRIGGER IF EXISTS tasks_partition_sync ON tasks",
+        "DROP FUNCTION IF EXISTS tasks_partition_sync()",
+    ]
+
+
+def copy_batch_sql() -> str:
+    """
+    Copy the next `:batch_size` rows after `:after_id`. Source rows are locked
+    FOR SHARE so concurrent updates wait for the copy and then go through the
+    trigger. Returns the last id read and the number of rows read.
+    """
+    columns = ", ".join(TASK_COLUMNS)
+    return f"""
+        WITH src AS (
+            SELECT {columns} FROM tasks
+            WHERE id > :after_id
+            ORDER BY id
+            LIMIT :batch_size
+            FOR SHARE
+        ), copied AS (
+            INSERT INTO {SHADOW_TABLE} ({columns})
+            SELECT {columns} FROM src
+            ON CONFLICT (id, {PARTITION_KEY}) DO NOTHING
+        )
+        SELECT max(id), count(*) FROM src
+    """
+
+
+def swap_tables_sql() -> List[str]:
+    """Statements run inside one transaction holding an ACCESS EXCLUSIVE lock on tasks."""
+    statements = [
+        "SET LOCAL lock_timeout = '5s'",
+        f"LOCK TABLE tasks, {SHADOW_TABLE} IN ACCESS EXCLUSIVE MODE",
+        *drop_sync_trigger_sql(),
+        f"ALTER TABLE tasks RENAME TO {OLD_TABLE}",
+        f"ALTER TABLE {OLD_TABLE} RENAME CONSTRAINT tasks_pkey TO {OLD_TABLE}_pkey",
+        f"ALTER TABLE {OLD_TABLE} RENAME CONSTRAINT tasks_owner_id_fkey TO {OLD_TABLE}_owner_id_fkey",
+        f"ALTER TABLE {SHADOW_TABLE} RENAME TO tasks",
+        f"ALTER TABLE tasks RENAME CONSTRAINT {SHADOW_TABLE}_pkey TO tasks_pkey",
+        f"ALTER TABLE tasks RENAME CONSTRAINT {SHADOW_TABLE}_owner_id_fkey TO tasks_owner_id_fkey",
+        "ALTER SEQUENCE tasks_id_seq OWNED BY tasks.id",
+    ]
+    for suffix in INDEXES:
+        statements.append(f"ALTER INDEX ix_tasks_{suffix} RENAME TO ix_{OLD_TABLE}_{suffix}")
+        statements.append(f"ALTER INDEX ix_tasks_p_{suffix} RENAME TO ix_tasks_{suffix}")
+    return statements
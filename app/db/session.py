@@ -1,12 +1,97 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from app.core.config import settings
 
-engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI, echo=False)
-AsyncSessionLocal = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
-)
+logger = logging.getLogger(__name__)
+
+# The engine is created by the app lifespan (or a job's CLI) through
+# init_engine(), not at import time, so importing the app stays cheap and
+# the asyncpg dialect is only loaded by processes that talk to the database.
+engine: Optional[AsyncEngine] = None
+AsyncSessionLocal = async_sessionmaker(class_=AsyncSession, expire_on_commit=False)
+
+
+def init_engine() -> AsyncEngine:
+    global engine
+    if engine is None:
+        engine = create_async_engine(
+            settings.SQLALCHEMY_DATABASE_URI,
+            echo=False,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        )
+        AsyncSessionLocal.configure(bind=engine)
+    return engine
+
+
+async def dispose_engine() -> None:
+    global engine
+    if engine is not None:
+        await engine.dispose()
+        engine = None
+        AsyncSessionLocal.configure(bind=None)
+
+
+async def warm_pool(connections: int) -> None:
+    """Open `connections` pooled connections up front so the first requests don't pay for them."""
+    connections = min(connections, settings.DB_POOL_SIZE)
+    if engine is None or connections <= 0:
+        return
+
+    async def connect() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    results = await asyncio.gather(*(connect() for _ in range(connections)), return_exceptions=True)
+    failed = [result for result in results if isinstance(result, Exception)]
+    if failed:
+        # Not fatal: readiness reports the database until it is reachable
+        logger.warning("Could not warm the DB pool: %s", failed[0])
+
 
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+
+_ATOMIC = "atomic"
+
+
+@asynccontextmanager
+async def atomic(db: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    Group writes made through `commit()` into the caller's transaction.
+
+    Inside the block `commit()` only flushes; the caller commits or rolls
+    back once, after its own statements on the same session.
+    """
+    db.info[_ATOMIC] = True
+    try:
+        yield db
+    finally:
+        db.info.pop(_ATOMIC, None)
+
+
+async def commit(db: AsyncSession) -> None:
+    """Commit `db`, or only flush it inside an `atomic()` block."""
+    if db.info.get(_ATOMIC):
+        await db.flush()
+    else:
+        await db.commit()
+
+def get_pool_status() -> dict:
+    if engine is None:
+        return {"size": 0, "checked_in": 0, "checked_out": 0, "overflow": 0}
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
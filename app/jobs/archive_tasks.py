@@ -0,0 +1,107 @@
+import argparse
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, init_engine
+from app.services.archive_service import TaskArchiveService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ArchiveStats:
+    batches: int = 0
+    rows: int = 0
+    last_id: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+
+async def archive_deleted_tasks(
+    older_than_days: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    pause: Optional[float] = None,
+    max_batches: Optional[int] = None,
+    on_progress: Optional[Callable[[ArchiveStats], None]] = None,
+) -> ArchiveStats:
+    """
+    Archive tasks soft-deleted more than `older_than_days` ago.
+
+    Works in keyset-ordered batches of `batch_size`, sleeping `pause` seconds
+    between batches so the job does not monopolise the database.
+    """
+    older_than_days = settings.TASK_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or settings.TASK_ARCHIVE_BATCH_SIZE
+    pause = settings.TASK_ARCHIVE_BATCH_PAUSE_SECONDS if pause is None else pause
+
+    deleted_before = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    service = TaskArchiveService()
+    stats = ArchiveStats()
+
+    async with AsyncSessionLocal() as db:
+        while max_batches is None or stats.batches < max_batches:
+            moved_ids = await service.archive_batch(db, deleted_before, stats.last_id, batch_size)
+            if not moved_ids:
+                break
+
+            stats.batches += 1
+            stats.rows += len(moved_ids)
+            stats.last_id = max(moved_ids)
+
+            logger.info(
+                "Archived %d tasks in %d batches (%.1f rows/s, last id %d)",
+                stats.rows, stats.batches, stats.rows_per_second, stats.last_id,
+            )
+            if on_progress is not None:
+                on_progress(stats)
+
+            if len(moved_ids) < batch_size:
+                break
+            await asyncio.sleep(pause)
+
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Archive and purge soft-deleted tasks")
+    parser.add_argument("--days", type=int, default=settings.TASK_ARCHIVE_AFTER_DAYS,
+                        help="Archive tasks deleted more than this many days ago")
+    parser.add_argument("--batch-size", type=int, default=settings.TASK_ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--pause", type=float, default=settings.TASK_ARCHIVE_BATCH_PAUSE_SECONDS,
+                        help="Seconds to sleep between batches")
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+
+    def report(stats: ArchiveStats) -> None:
+        print(
+            f"batch {stats.batches}: {stats.rows} rows archived, "
+            f"{stats.rows_per_second:.1f} rows/s, last id {stats.last_id}",
+            flush=True,
+        )
+
+    init_engine()
+    stats = asyncio.run(archive_deleted_tasks(
+        older_than_days=args.days,
+        batch_size=args.batch_size,
+        pause=args.pause,
+        max_batches=args.max_batches,
+        on_progress=report,
+    ))
+    print(f"Done: {stats.rows} rows in {stats.elapsed:.1f}s ({stats.rows_per_second:.1f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+from app.services.outbox_service import TASK_CREATED, TASK_DELETED, TASK_UPDATED
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# topic -> handler. Delivery is at least once (a job is retried after a
+# failure, a timeout or a worker crash), so handlers must be idempotent.
+HANDLERS: Dict[str, Handler] = {}
+
+audit_logger = logging.getLogger("app.audit")
+
+
+def register_handler(topic: str) -> Callable[[Handler], Handler]:
+    """Decorator registering `handler` as the one that runs jobs of `topic`."""
+    def decorator(handler: Handler) -> Handler:
+        if topic in HANDLERS:
+            raise ValueError(f"A handler is already registered for {topic!r}")
+        HANDLERS[topic] = handler
+        return handler
+    return decorator
+
+
+async def audit_task_event(payload: Dict[str, Any]) -> None:
+    audit_logger.info("Task %s %s", payload["task_id"], payload["event"], extra={"audit": payload})
+
+
+for _topic in (TASK_CREATED, TASK_UPDATED, TASK_DELETED):
+    register_handler(_topic)(audit_task_event)
@@ -0,0 +1,248 @@
+"""
+Outbox worker pool.
+
+Runs the jobs that task writes put in `outbox_jobs` (see
+`app.services.outbox_service`). Every process started with the app runs
+OUTBOX_WORKERS claim loops; they can also run on their own:
+
+    python -m app.jobs.outbox_worker            # until SIGINT / SIGTERM
+    python -m app.jobs.outbox_worker --drain    # run the due jobs and exit
+
+Each loop claims a batch with FOR UPDATE SKIP LOCKED, so any number of loops
+and processes share the queue without handing out a job twice, and runs the
+batch's handlers concurrently. A loop only claims as many jobs as there are
+free handler slots (OUTBOX_CONCURRENCY per process, shared by the loops), so
+a claimed job starts right away and its lease only has to cover the handler
+timeout. The outcome is recorded only while the claim still holds, so a
+worker whose lease expired cannot delete or reschedule the job another
+worker has claimed since.
+
+Failed jobs are retried with exponential backoff and jitter; after
+OUTBOX_MAX_ATTEMPTS they are left as `dead`.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import signal
+import time
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logging_config import request_id_var, setup_logging
+from app.db.session import AsyncSessionLocal, init_engine
+from app.jobs.outbox_handlers import HANDLERS, Handler
+from app.services.outbox_service import ClaimedJob, OutboxService
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with equal jitter, capped at OUTBOX_RETRY_MAX_SECONDS."""
+    delay = min(settings.OUTBOX_RETRY_MAX_SECONDS, settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class OutboxWorker:
+
+    def __init__(self, handlers: Dict[str, Handler] = HANDLERS):
+        self.handlers = handlers
+        self.service = OutboxService()
+        self._stopping = asyncio.Event()
+        self._slot_freed = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        # Handler slots reserved by claims, and handlers running
+        self.reserved = 0
+        self.in_flight = 0
+        self.counters = {"claimed": 0, "succeeded": 0, "retried": 0, "dead_lettered": 0, "lease_lost": 0}
+        self.depth: Optional[dict] = None
+        self.depth_updated_at: Optional[float] = None
+
+    def start(self, workers: Optional[int] = None) -> List[asyncio.Task]:
+        if settings.OUTBOX_LEASE_SECONDS <= settings.OUTBOX_HANDLER_TIMEOUT_SECONDS:
+            logger.warning(
+                "OUTBOX_LEASE_SECONDS (%s) should be above OUTBOX_HANDLER_TIMEOUT_SECONDS (%s): "
+                "jobs still running may be claimed again",
+                settings.OUTBOX_LEASE_SECONDS, settings.OUTBOX_HANDLER_TIMEOUT_SECONDS,
+            )
+        self._stopping.clear()
+        self._tasks = [
+            asyncio.create_task(self.run(), name=f"outbox-worker-{i}")
+            for i in range(workers or settings.OUTBOX_WORKERS)
+        ]
+        return self._tasks
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop claiming and give in-flight batches `timeout` seconds to finish."""
+        self._stopping.set()
+        # Wake loops waiting for a slot
+        self._slot_freed.set()
+        if not self._tasks:
+            return
+        timeout = settings.OUTBOX_HANDLER_TIMEOUT_SECONDS if timeout is None else timeout
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        # Cancelled jobs are claimed again once their lease expires
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                claimed = await self.run_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox batch failed")
+                claimed = 0
+            # Claim again right away while jobs are due
+            if claimed == 0:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), settings.OUTBOX_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def reserve_slots(self) -> int:
+        """Wait for a free handler slot, then reserve up to OUTBOX_BATCH_SIZE of them."""
+        while self.reserved >= settings.OUTBOX_CONCURRENCY and not self._stopping.is_set():
+            self._slot_freed.clear()
+            await self._slot_freed.wait()
+        count = max(0, min(settings.OUTBOX_BATCH_SIZE, settings.OUTBOX_CONCURRENCY - self.reserved))
+        self.reserved += count
+        return count
+
+    def release_slots(self, count: int) -> None:
+        self.reserved -= count
+        self._slot_freed.set()
+
+    async def run_batch(self) -> int:
+        """Claim due jobs for the free handler slots, run them and record the outcomes. Returns the number claimed."""
+        limit = await self.reserve_slots()
+        jobs: List[ClaimedJob] = []
+        try:
+            if limit and not self._stopping.is_set():
+                async with AsyncSessionLocal() as db:
+                    jobs = await self.service.claim_batch(db, limit, settings.OUTBOX_LEASE_SECONDS)
+        finally:
+            self.release_slots(limit - len(jobs))
+        if not jobs:
+            return 0
+        self.counters["claimed"] += len(jobs)
+
+        errors = await asyncio.gather(*(self.dispatch(job) for job in jobs))
+
+        async with AsyncSessionLocal() as db:
+            succeeded = [job for job, error in zip(jobs, errors) if error is None]
+            completed = await self.service.complete(db, succeeded)
+            self.counters["succeeded"] += len(succeeded)
+            lost = len(succeeded) - completed
+            for job, error in zip(jobs, errors):
+                if error is None:
+                    continue
+                if job.topic not in self.handlers or job.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                    logger.error(
+                        "Outbox job %d (%s) dead-lettered after %d attempts: %s",
+                        job.id, job.topic, job.attempts, error,
+                    )
+                    recorded = await self.service.dead_letter(db, job, error)
+                    self.counters["dead_lettered"] += 1
+                else:
+                    recorded = await self.service.retry(db, job, retry_delay(job.attempts), error)
+                    self.counters["retried"] += 1
+                lost += not recorded
+            await db.commit()
+        if lost:
+            # Another worker claimed these again after their lease expired;
+            # its outcome is the one that counts
+            logger.warning("Lost the lease on %d outbox jobs before recording their outcome", lost)
+            self.counters["lease_lost"] += lost
+        return len(jobs)
+
+    async def dispatch(self, job: ClaimedJob) -> Optional[str]:
+        """Run the job's handler in the slot reserved for it. Returns None on success, otherwise the error."""
+        try:
+            handler = self.handlers.get(job.topic)
+            if handler is None:
+                return f"No handler registered for topic {job.topic!r}"
+
+            # Log lines of the handler carry the ID of the request that enqueued the job
+            token = request_id_var.set(job.payload.get("request_id"))
+            self.in_flight += 1
+            try:
+                await asyncio.wait_for(handler(job.payload), settings.OUTBOX_HANDLER_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                return f"Timed out after {settings.OUTBOX_HANDLER_TIMEOUT_SECONDS}s"
+            except Exception as exc:
+                logger.warning(
+                    "Outbox job %d (%s) failed on attempt %d", job.id, job.topic, job.attempts,
+                    exc_info=exc,
+                )
+                return repr(exc)
+            finally:
+                self.in_flight -= 1
+                request_id_var.reset(token)
+            return None
+        finally:
+            self.release_slots(1)
+
+    async def refresh_depth(self) -> None:
+        async with AsyncSessionLocal() as db:
+            self.depth = await self.service.queue_depth(db)
+        self.depth_updated_at = time.time()
+
+    def snapshot(self) -> dict:
+        return {
+            "workers": len(self._tasks),
+            "in_flight": self.in_flight,
+            "concurrency": settings.OUTBOX_CONCURRENCY,
+            **self.counters,
+            "depth": self.depth,
+            "depth_age_seconds": (
+                round(time.time() - self.depth_updated_at, 1) if self.depth_updated_at else None
+            ),
+        }
+
+
+outbox_worker = OutboxWorker()
+
+
+async def drain() -> int:
+    """Run batches until no job is due. Returns the number of jobs claimed."""
+    total = 0
+    while True:
+        claimed = await outbox_worker.run_batch()
+        total += claimed
+        if claimed == 0:
+            return total
+
+
+async def serve(workers: int) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    outbox_worker.start(workers)
+    logger.info("Outbox worker running with %d loops", workers)
+    await stop.wait()
+    await outbox_worker.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run outbox jobs")
+    parser.add_argument("--workers", type=int, default=settings.OUTBOX_WORKERS)
+    parser.add_argument("--drain", action="store_true", help="Run the jobs that are due, then exit")
+    args = parser.parse_args()
+
+    setup_logging()
+    init_engine()
+    if args.drain:
+        total = asyncio.run(drain())
+        print(f"Ran {total} outbox jobs: {outbox_worker.counters}")
+    else:
+        asyncio.run(serve(args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Move `tasks` onto a table partitioned by HASH (owner_id); see app/db/partitioning.py.
+
+    python -m app.jobs.partition_tasks prepare --partitions 16
+    python -m app.jobs.partition_tasks copy
+    python -m app.jobs.partition_tasks swap
+    python -m app.jobs.partition_tasks all --partitions 16
+
+Every step looks at the current schema first and can be re-run: a step that
+has already been done is skipped, and nothing happens once `tasks` is
+partitioned.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import partitioning
+from app.db.session import AsyncSessionLocal, init_engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PartitionState:
+    partitioned: bool
+    prepared: bool
+    partition_count: int
+    owner_not_null: bool
+
+
+async def get_state(db: AsyncSession) -> PartitionState:
+    row = (await db.execute(text(partitioning.STATE_SQL))).one()
+    await db.commit()
+    return PartitionState(*row)
+
+
+async def prepare(partition_count: int) -> None:
+    """Create the partitioned shadow table and the trigger keeping it in sync."""
+    async with AsyncSessionLocal() as db:
+        state = await get_state(db)
+        if state.partitioned:
+            logger.info("tasks is already partitioned")
+            return
+        if state.prepared:
+            if state.partition_count != partition_count:
+                raise RuntimeError(
+                    f"{partitioning.SHADOW_TABLE} already exists with {state.partition_count} "
+                    f"partitions; drop it to change the count"
+                )
+            logger.info("%s already exists", partitioning.SHADOW_TABLE)
+            return
+
+        if not state.owner_not_null:
+            orphans = (await db.execute(text(partitioning.COUNT_ORPHANS_SQL))).scalar()
+            if orphans:
+                raise RuntimeError(
+                    f"{orphans} tasks have no owner_id; the partition key cannot be NULL. "
+                    f"They are not reachable through the API: assign or delete them first"
+                )
+            # One transaction per statement: the validation must not run
+            # under the ACCESS EXCLUSIVE lock taken when adding the check
+            for statement in partitioning.set_owner_not_null_sql():
+                await db.execute(text(statement))
+                await db.commit()
+            logger.info("tasks.owner_id is now NOT NULL")
+
+        for statement in partitioning.create_partitioned_table_sql(partition_count):
+            await db.execute(text(statement))
+        for statement in partitioning.create_sync_trigger_sql():
+            await db.execute(text(statement))
+        await db.commit()
+        logger.info("Created %s with %d partitions", partitioning.SHADOW_TABLE, partition_count)
+
+
+async def copy_tasks(batch_size: int, pause: float) -> int:
+    """Copy every existing row of `tasks` into the partitioned shadow table."""
+    copy_stmt = text(partitioning.copy_batch_sql())
+    after_id = 0
+    total = 0
+    started = time.perf_counter()
+
+    async with AsyncSessionLocal() as db:
+        state = await get_state(db)
+        if state.partitioned:
+            logger.info("tasks is already partitioned")
+            return 0
+        if not state.prepared:
+            raise RuntimeError("Run the prepare step first")
+
+        while True:
+            result = await db.execute(copy_stmt, {"after_id": after_id, "batch_size": batch_size})
+            last_id, count = result.one()
+            await db.commit()
+            if not count:
+                break
+
+            after_id = last_id
+            total += count
+            elapsed = time.perf_counter() - started
+            logger.info(
+                "Copied %d tasks (%.1f rows/s, last id %d)",
+                total, total / elapsed if elapsed > 0 else 0.0, after_id,
+            )
+            await asyncio.sleep(pause)
+
+    return total
+
+
+async def swap_tables() -> bool:
+    """
+    Replace `tasks` with the partitioned table. Refuses to swap while the row
+    counts differ, which would mean the copy has not finished. Returns False
+    when there was nothing to swap.
+    """
+    shadow = partitioning.SHADOW_TABLE
+    async with AsyncSessionLocal() as db:
+        state = await get_state(db)
+        if state.partitioned:
+            logger.info("tasks is already partitioned")
+            return False
+        if not state.prepared:
+            raise RuntimeError("Run the prepare and copy steps first")
+
+        counts = await db.execute(
+            text(f"SELECT (SELECT count(*) FROM tasks), (SELECT count(*) FROM {shadow})")
+        )
+        live, copied = counts.one()
+        if live != copied:
+            raise RuntimeError(
+                f"tasks has {live} rows but {shadow} has {copied}; run the copy step first"
+            )
+
+        for statement in partitioning.swap_tables_sql():
+            await db.execute(text(statement))
+        await db.commit()
+    return True
+
+
+async def run(step: str, partition_count: int, batch_size: int, pause: float) -> None:
+    if step in ("prepare", "all"):
+        await prepare(partition_count)
+    if step in ("copy", "all"):
+        total = await copy_tasks(batch_size, pause)
+        print(f"Copied {total} tasks")
+    if step in ("swap", "all"):
+        if await swap_tables():
+            print("tasks is now partitioned")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Move tasks onto a table partitioned by HASH (owner_id)")
+    parser.add_argument("step", choices=["prepare", "copy", "swap", "all"])
+    parser.add_argument("--partitions", type=int, default=settings.TASKS_PARTITION_COUNT,
+                        help="Number of hash partitions (prepare step)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between batches")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_engine()
+    asyncio.run(run(args.step, args.partitions, args.batch_size, args.pause))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import argparse
+import asyncio
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, init_engine
+from app.services.idempotency_service import IdempotencyService
+
+logger = logging.getLogger(__name__)
+
+
+async def purge_idempotency_keys(batch_size: Optional[int] = None) -> int:
+    """Delete expired idempotency keys in batches. Returns the total deleted."""
+    batch_size = batch_size or settings.IDEMPOTENCY_PURGE_BATCH_SIZE
+    service = IdempotencyService()
+    total = 0
+
+    async with AsyncSessionLocal() as db:
+        while True:
+            deleted = await service.purge_expired(db, batch_size)
+            total += deleted
+            if deleted < batch_size:
+                break
+            # Let request handlers run between batches
+            await asyncio.sleep(0)
+
+    if total:
+        logger.info("Purged %d expired idempotency keys", total)
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Purge expired idempotency keys")
+    parser.add_argument("--batch-size", type=int, default=settings.IDEMPOTENCY_PURGE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    init_engine()
+    total = asyncio.run(purge_idempotency_keys(args.batch_size))
+    print(f"Purged {total} expired idempotency keys")
+
+
+if __name__ == "__main__":
+    main()
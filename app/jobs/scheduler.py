@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List
+
+from app.core.config import settings
+from app.jobs.archive_tasks import archive_deleted_tasks
+from app.jobs.outbox_worker import outbox_worker
+from app.jobs.purge_idempotency_keys import purge_idempotency_keys
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(
+    name: str, interval: float, job: Callable[[], Awaitable[object]]
+) -> None:
+    """Run `job` every `interval` seconds until cancelled, logging failures."""
+    while True:
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Background job %s failed", name)
+        await asyncio.sleep(interval)
+
+
+def start_background_jobs() -> List[asyncio.Task]:
+    # The jobs work on Postgres tables
+    if not settings.BACKGROUND_JOBS_ENABLED or settings.STORAGE_BACKEND == "memory":
+        return []
+
+    jobs = [
+        ("purge-idempotency-keys", settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS, purge_idempotency_keys),
+    ]
+    if settings.TASK_ARCHIVE_ENABLED:
+        jobs.append(("archive-tasks", settings.TASK_ARCHIVE_INTERVAL_SECONDS, archive_deleted_tasks))
+
+    run_outbox = settings.OUTBOX_ENABLED and settings.OUTBOX_WORKER_ENABLED
+    if run_outbox:
+        jobs.append(("outbox-metrics", settings.OUTBOX_METRICS_INTERVAL_SECONDS, outbox_worker.refresh_depth))
+
+    tasks = [
+        asyncio.create_task(run_periodically(name, interval, job), name=name)
+        for name, interval, job in jobs
+    ]
+    if run_outbox:
+        tasks.extend(outbox_worker.start())
+    return tasks
+
+
+async def stop_background_jobs(tasks: List[asyncio.Task]) -> None:
+    # Let the outbox finish the batches it claimed before cancelling the rest
+    await outbox_worker.stop()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -1,39 +1,98 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError, HTTPException
 from app.core.config import settings
-from app.api.v1.routes import auth_route, tasks_route
+from app.core.compression import CompressionMiddleware
+from app.api.v1.routes import auth_route, health_route, tasks_route
+from app.core.load_shedding import LoadSheddingMiddleware
+from app.core.logging_config import setup_logging, shutdown_logging
 from app.core.middleware import RequestIDMiddleware
+from app.core.rate_limit import RateLimitMiddleware
 from app.core.exceptions import (
     http_exception_handler,
     validation_exception_handler,
     generic_exception_handler
 )
+from app.db.session import dispose_engine, init_engine, warm_pool
 from app.schemas.response import Envelope, Meta
 
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    description="REST API for managing Tasks with JWT Authentication",
-    version="1.0.0",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json" if settings.ENABLE_DOCS else None,
-    docs_url="/docs" if settings.ENABLE_DOCS else None,
-    redoc_url="/redoc" if settings.ENABLE_DOCS else None,
-)
 
-# Add Middleware
-app.add_middleware(RequestIDMiddleware)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Here rather than in create_app(): importing app.main must not start the
+    # listener thread. Under app.server, or any runner that already set up
+    # logging, this is a no-op and the runner stops the listener.
+    owns_logging = setup_logging()
+    if settings.STORAGE_BACKEND == "memory":
+        # No engine: nothing in memory mode talks to the database
+        from app.repositories.memory import seed_memory_store
+
+        seed_memory_store()
+    else:
+        init_engine()
+        await warm_pool(settings.DB_POOL_WARM_CONNECTIONS)
+    # Build the OpenAPI schema now instead of on the first /docs hit
+    if app.openapi_url:
+        app.openapi()
 
-# Register Exception Handlers
-app.add_exception_handler(HTTPException, http_exception_handler)
-app.add_exception_handler(RequestValidationError, validation_exception_handler)
-app.add_exception_handler(Exception, generic_exception_handler)
+    # Imported here so processes that never start the app don't load the jobs
+    from app.jobs.scheduler import start_background_jobs, stop_background_jobs
+
+    background_jobs = start_background_jobs()
+    yield
+    await stop_background_jobs(background_jobs)
+    await dispose_engine()
+    if owns_logging:
+        shutdown_logging()
 
-# Include Routers
-app.include_router(auth_route.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
-app.include_router(tasks_route.router, prefix=f"{settings.API_V1_STR}/tasks", tags=["tasks"])
 
-@app.get("/", response_model=Envelope[dict])
 def root(request: Request):
     return Envelope(
         data={"message": "Welcome to the Technical Test API"},
         meta=Meta(request_id=getattr(request.state, "request_id", None))
     )
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(
+        title=settings.PROJECT_NAME,
+        description="REST API for managing Tasks with JWT Authentication",
+        version="1.0.0",
+        openapi_url=f"{settings.API_V1_STR}/openapi.json" if settings.ENABLE_DOCS else None,
+        docs_url="/docs" if settings.ENABLE_DOCS else None,
+        redoc_url="/redoc" if settings.ENABLE_DOCS else None,
+        lifespan=lifespan,
+    )
+
+    # Add Middleware (the last one added is the outermost)
+    # Compression goes innermost: it sees the app's responses before the
+    # BaseHTTPMiddleware layers re-stream them, so small bodies keep their
+    # Content-Length and can be skipped
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(CompressionMiddleware)
+    if settings.PROFILING_ENABLED:
+        # cProfile and the sampler are only loaded when profiling is on
+        from app.core.profiling import ProfilingMiddleware
+
+        app.add_middleware(ProfilingMiddleware)
+    if settings.RATE_LIMIT_ENABLED:
+        app.add_middleware(RateLimitMiddleware)
+    if settings.LOAD_SHED_ENABLED:
+        app.add_middleware(LoadSheddingMiddleware)
+    app.add_middleware(RequestIDMiddleware)
+
+    # Register Exception Handlers
+    app.add_exception_handler(HTTPException, http_exception_handler)
+    app.add_exception_handler(RequestValidationError, validation_exception_handler)
+    app.add_exception_handler(Exception, generic_exception_handler)
+
+    # Include Routers
+    app.include_router(auth_route.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
+    app.include_router(tasks_route.router, prefix=f"{settings.API_V1_STR}/tasks", tags=["tasks"])
+    app.include_router(health_route.router, prefix="/health", tags=["health"])
+
+    app.add_api_route("/", root, methods=["GET"], response_model=Envelope[dict])
+    return app
+
+
+app = create_app()
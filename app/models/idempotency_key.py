@@ -0,0 +1,22 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, JSON, String, UniqueConstraint
+from app.db.base_class import Base
+import enum
+
+class IdempotencyStatus(str, enum.Enum):
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_id_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    status = Column(String, default=IdempotencyStatus.IN_PROGRESS.value, nullable=False)
+    response_status = Column(Integer, nullable=True)
+    response_body = Column(JSON, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
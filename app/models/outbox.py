@@ -0,0 +1,34 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, JSON, String, Text, text
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+import enum
+
+class OutboxStatus(str, enum.Enum):
+    PENDING = "pending"
+    DEAD = "dead"
+
+class OutboxJob(Base):
+    """
+    A side effect to run after a write committed (see app/jobs/outbox_worker.py).
+
+    Rows are inserted in the same transaction as the write. A worker claims a
+    pending row by pushing `available_at` forward by a lease, deletes it once
+    its handler succeeded and otherwise reschedules it with a backoff, until
+    it runs out of attempts and is left as `dead`.
+    """
+    __tablename__ = "outbox_jobs"
+    __table_args__ = (
+        # Claim query: pending jobs that are due, oldest first
+        Index(
+            "ix_outbox_jobs_pending", "available_at", "id",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    id = Column(BigInteger, primary_key=True, index=True, autoincrement=True)
+    topic = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String, default=OutboxStatus.PENDING.value, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_error = Column(Text, nullable=True)
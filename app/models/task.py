@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index, text
 from app.db.base_class import Base
 import enum
 
@@ -9,9 +9,24 @@ class TaskStatus(str, enum.Enum):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Soft-deleted rows only; used by the archive job's keyset scan
+        Index("ix_tasks_archivable", "id", postgresql_where=text("is_deleted")),
+        # Listing: owner's live tasks, newest first
+        Index(
+            "ix_tasks_owner_active_created_at", "owner_id", text("created_at DESC"),
+            postgresql_where=text("NOT is_deleted"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, index=True, nullable=False)
     description = Column(Text, nullable=True)
     status = Column(String, default=TaskStatus.PENDING.value, index=True)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    # The ORM identifies a task by (id, owner_id), so its UPDATEs, DELETEs and
+    # refreshes filter on owner_id too and prune to one partition once tasks
+    # is hash-partitioned (app.jobs.partition_tasks). The table's primary key
+    # stays whatever the schema says.
+    __mapper_args__ = {"primary_key": [id, owner_id]}
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, DateTime, Integer, String, Text
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class TaskArchive(Base):
+    """Soft-deleted tasks moved out of `tasks` by the archive job."""
+    __tablename__ = "tasks_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    status = Column(String, nullable=True)
+    owner_id = Column(Integer, nullable=True, index=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
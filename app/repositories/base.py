@@ -0,0 +1,74 @@
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from app.models.task import Task
+from app.models.user import User
+
+# (status_code, JSON body or None)
+StoredResponse = Tuple[int, Optional[Any]]
+
+
+class TaskRepository(ABC):
+    """
+    Storage of tasks.
+
+    Reads never return soft-deleted tasks. `list` returns an owner's tasks
+    newest first. Writes are committed before they return, except inside an
+    `app.db.session.atomic()` block, where the caller commits. Where the
+    backend supports it, the task.* outbox job of a write is committed with it.
+    """
+
+    @abstractmethod
+    async def count(self, owner_id: int) -> int:
+        ...
+
+    @abstractmethod
+    async def list(self, owner_id: int, offset: int, limit: int) -> List[Task]:
+        ...
+
+    @abstractmethod
+    async def get(self, task_id: int, owner_id: int) -> Optional[Task]:
+        ...
+
+    @abstractmethod
+    async def create(self, owner_id: int, data: dict) -> Task:
+        ...
+
+    @abstractmethod
+    async def update(self, task: Task, data: dict) -> Task:
+        ...
+
+    @abstractmethod
+    async def soft_delete(self, task: Task) -> None:
+        ...
+
+
+class UserRepository(ABC):
+    """Storage of users."""
+
+    @abstractmethod
+    async def get_by_email(self, email: str) -> Optional[User]:
+        ...
+
+
+class IdempotencyRepository(ABC):
+    """
+    Storage of the responses of requests sent with an Idempotency-Key.
+
+    `execute` runs `operation` at most once per (user, key) and returns its
+    response and whether it was replayed. It raises
+    `IdempotencyKeyReusedError` when the key was used with another request
+    and `IdempotencyKeyInProgressError` when the first request is still
+    running after IDEMPOTENCY_WAIT_TIMEOUT_SECONDS. A key whose operation
+    failed is released so the client can retry.
+    """
+
+    @abstractmethod
+    async def execute(
+        self,
+        user_id: int,
+        key: str,
+        request_hash: str,
+        operation: Callable[[], Awaitable[StoredResponse]],
+    ) -> Tuple[StoredResponse, bool]:
+        ...
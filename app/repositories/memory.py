@@ -0,0 +1,188 @@
+import asyncio
+import bisect
+import itertools
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core import security
+from app.core.config import settings
+from app.models.task import Task, TaskStatus
+from app.models.user import User
+from app.repositories.base import IdempotencyRepository, StoredResponse, TaskRepository, UserRepository
+from app.services.idempotency_service import IdempotencyKeyInProgressError, IdempotencyKeyReusedError
+
+
+@dataclass
+class MemoryIdempotencyKey:
+    request_hash: str
+    expires_at: datetime
+    # None while the first request runs; set once before `done` is
+    response: Optional[StoredResponse] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class MemoryStore:
+    """
+    Process-local storage for the in-memory repositories.
+
+    Every owner has a sorted index of `(created_at, id)` keys over their live
+    tasks, so counting is O(1), a page is a slice and inserting a new (newest)
+    task is an append. Soft-deleted tasks stay in `tasks` but leave the index.
+
+    Nothing awaits while the store is modified, so each operation is atomic
+    on the event loop.
+    """
+
+    def __init__(self):
+        self.users: Dict[str, User] = {}
+        self.tasks: Dict[int, Task] = {}
+        self.task_index: Dict[int, List[Tuple[datetime, int]]] = defaultdict(list)
+        self.idempotency_keys: Dict[Tuple[int, str], MemoryIdempotencyKey] = {}
+        self._user_ids = itertools.count(1)
+        self._task_ids = itertools.count(1)
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def add_user(self, email: str, hashed_password: str, is_active: bool = True) -> User:
+        now = datetime.now(timezone.utc)
+        user = User(
+            id=next(self._user_ids), email=email, hashed_password=hashed_password,
+            is_active=is_active, created_at=now, updated_at=now, is_deleted=False,
+        )
+        self.users[email] = user
+        return user
+
+    def add_task(self, owner_id: int, created_at: Optional[datetime] = None, **fields) -> Task:
+        created_at = created_at or datetime.now(timezone.utc)
+        fields.setdefault("status", TaskStatus.PENDING.value)
+        fields.setdefault("is_deleted", False)
+        fields.setdefault("updated_at", created_at)
+        task = Task(id=next(self._task_ids), owner_id=owner_id, created_at=created_at, **fields)
+        self.tasks[task.id] = task
+        if not task.is_deleted:
+            bisect.insort(self.task_index[owner_id], (created_at, task.id))
+        return task
+
+    def remove_from_index(self, task: Task) -> None:
+        index = self.task_index[task.owner_id]
+        key = (task.created_at, task.id)
+        position = bisect.bisect_left(index, key)
+        if position < len(index) and index[position] == key:
+            del index[position]
+
+
+store = MemoryStore()
+
+
+def seed_memory_store() -> None:
+    """Create the initial user, like the seed migration does for Postgres."""
+    if settings.FIRST_SUPERUSER not in store.users:
+        store.add_user(settings.FIRST_SUPERUSER, security.get_password_hash(settings.FIRST_SUPERUSER_PASSWORD))
+
+
+class InMemoryTaskRepository(TaskRepository):
+    def __init__(self, memory: MemoryStore = store):
+        self.store = memory
+
+    async def count(self, owner_id: int) -> int:
+        return len(self.store.task_index.get(owner_id, ()))
+
+    async def list(self, owner_id: int, offset: int, limit: int) -> List[Task]:
+        # The index is oldest first; pages are newest first
+        index = self.store.task_index.get(owner_id, [])
+        end = max(0, len(index) - offset)
+        start = max(0, end - limit)
+        return [self.store.tasks[task_id] for _, task_id in reversed(index[start:end])]
+
+    async def get(self, task_id: int, owner_id: int) -> Optional[Task]:
+        task = self.store.tasks.get(task_id)
+        if task is None or task.owner_id != owner_id or task.is_deleted:
+            return None
+        return task
+
+    async def create(self, owner_id: int, data: dict) -> Task:
+        return self.store.add_task(owner_id, **data)
+
+    async def update(self, task: Task, data: dict) -> Task:
+        for field, value in data.items():
+            setattr(task, field, value)
+        task.updated_at = datetime.now(timezone.utc)
+        return task
+
+    async def soft_delete(self, task: Task) -> None:
+        self.store.remove_from_index(task)
+        task.is_deleted = True
+        task.deleted_at = datetime.now(timezone.utc)
+
+
+class InMemoryUserRepository(UserRepository):
+    def __init__(self, memory: MemoryStore = store):
+        self.store = memory
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        return self.store.users.get(email)
+
+
+class InMemoryIdempotencyRepository(IdempotencyRepository):
+    """
+    Keys in the memory store. Duplicates wait on the first request's event.
+
+    The operation's writes are not transactional here: a write made before
+    the operation failed stays, while the key is released.
+    """
+
+    def __init__(self, memory: MemoryStore = store):
+        self.store = memory
+
+    async def execute(
+        self,
+        user_id: int,
+        key: str,
+        request_hash: str,
+        operation: Callable[[], Awaitable[StoredResponse]],
+    ) -> Tuple[StoredResponse, bool]:
+        while True:
+            now = datetime.now(timezone.utc)
+            record = self.store.idempotency_keys.get((user_id, key))
+            if record is None or record.expires_at <= now:
+                return await self._run_claimed(user_id, key, request_hash, operation, now), False
+
+            if record.request_hash != request_hash:
+                raise IdempotencyKeyReusedError(key)
+
+            if record.response is None:
+                try:
+                    await asyncio.wait_for(record.done.wait(), settings.IDEMPOTENCY_WAIT_TIMEOUT_SECONDS)
+                except asyncio.TimeoutError:
+                    raise IdempotencyKeyInProgressError(key)
+                # Completed, or released by a failed request: look again
+                continue
+
+            return record.response, True
+
+    async def _run_claimed(
+        self,
+        user_id: int,
+        key: str,
+        request_hash: str,
+        operation: Callable[[], Awaitable[StoredResponse]],
+        now: datetime,
+    ) -> StoredResponse:
+        record = MemoryIdempotencyKey(
+            request_hash=request_hash,
+            expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+        )
+        self.store.idempotency_keys[(user_id, key)] = record
+        try:
+            record.response = await operation()
+        except BaseException:
+            # Nothing to roll back or await; release the key even when cancelled
+            if self.store.idempotency_keys.get((user_id, key)) is record:
+                del self.store.idempotency_keys[(user_id, key)]
+            raise
+        finally:
+            record.done.set()
+        return record.response
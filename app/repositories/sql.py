@@ -0,0 +1,138 @@
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, select, func, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging_config import request_id_var
+from app.db.session import commit
+from app.models.task import Task
+from app.models.user import User
+from app.repositories.base import IdempotencyRepository, StoredResponse, TaskRepository, UserRepository
+from app.services.idempotency_service import IdempotencyService, idempotency_service
+from app.services.outbox_service import OutboxService, TASK_CREATED, TASK_DELETED, TASK_UPDATED
+
+# Statements are built once at import time with bound parameters. A prebuilt
+# statement memoizes its cache key, so each execute() only binds values and
+# hits the engine's compiled cache instead of rebuilding and re-hashing the
+# select() construct. The builders also take literal values, which is how
+# benchmarks.micro measures the per-request construction this avoids.
+def _active_tasks(owner_id):
+    return (Task.owner_id == owner_id) & (Task.is_deleted == False)
+
+
+def count_tasks_query(owner_id=bindparam("owner_id")):
+    return select(func.count()).select_from(Task).where(_active_tasks(owner_id))
+
+
+def list_tasks_query(owner_id=bindparam("owner_id"), offset=bindparam("offset"), limit=bindparam("limit")):
+    return (
+        select(Task)
+        .where(_active_tasks(owner_id))
+        .order_by(desc(Task.created_at))
+        .offset(offset)
+        .limit(limit)
+    )
+
+
+def get_task_query(task_id=bindparam("task_id"), owner_id=bindparam("owner_id")):
+    return select(Task).where(Task.id == task_id, _active_tasks(owner_id))
+
+
+def user_by_email_query(email=bindparam("email")):
+    return select(User).where(User.email == email)
+
+
+COUNT_TASKS_STMT = count_tasks_query()
+LIST_TASKS_STMT = list_tasks_query()
+GET_TASK_STMT = get_task_query()
+USER_BY_EMAIL_STMT = user_by_email_query()
+
+
+class SQLAlchemyTaskRepository(TaskRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def count(self, owner_id: int) -> int:
+        result = await self.db.execute(COUNT_TASKS_STMT, {"owner_id": owner_id})
+        return result.scalar() or 0
+
+    async def list(self, owner_id: int, offset: int, limit: int) -> List[Task]:
+        result = await self.db.execute(
+            LIST_TASKS_STMT, {"owner_id": owner_id, "offset": offset, "limit": limit}
+        )
+        return list(result.scalars().all())
+
+    async def get(self, task_id: int, owner_id: int) -> Optional[Task]:
+        result = await self.db.execute(GET_TASK_STMT, {"task_id": task_id, "owner_id": owner_id})
+        return result.scalars().first()
+
+    def enqueue_event(self, topic: str, task: Task, **details) -> None:
+        """Add an outbox job for `task` to the current transaction (committed with the write)."""
+        if settings.OUTBOX_ENABLED:
+            OutboxService.enqueue(self.db, topic, {
+                "event": topic.rpartition(".")[2],
+                "task_id": task.id,
+                "owner_id": task.owner_id,
+                "request_id": request_id_var.get(),
+                **details,
+            })
+
+    async def create(self, owner_id: int, data: dict) -> Task:
+        task = Task(**data, owner_id=owner_id)
+        self.db.add(task)
+        if settings.OUTBOX_ENABLED:
+            # The job needs the task's id
+            await self.db.flush()
+        self.enqueue_event(TASK_CREATED, task)
+        await commit(self.db)
+        await self.db.refresh(task)
+        return task
+
+    async def update(self, task: Task, data: dict) -> Task:
+        for field, value in data.items():
+            setattr(task, field, value)
+
+        self.db.add(task)
+        self.enqueue_event(TASK_UPDATED, task, fields=sorted(data))
+        await commit(self.db)
+        await self.db.refresh(task)
+        return task
+
+    async def soft_delete(self, task: Task) -> None:
+        task.is_deleted = True
+        task.deleted_at = datetime.now(timezone.utc)
+        self.db.add(task)
+        self.enqueue_event(TASK_DELETED, task)
+        await commit(self.db)
+
+
+class SQLAlchemyUserRepository(UserRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        result = await self.db.execute(USER_BY_EMAIL_STMT, {"email": email})
+        return result.scalars().first()
+
+
+class SQLAlchemyIdempotencyRepository(IdempotencyRepository):
+    """
+    Keys in the `idempotency_keys` table (see IdempotencyService). The session
+    is the one the operation's repositories use, so the write and the stored
+    response commit together.
+    """
+
+    def __init__(self, db: AsyncSession, service: IdempotencyService = idempotency_service):
+        self.db = db
+        self.service = service
+
+    async def execute(
+        self,
+        user_id: int,
+        key: str,
+        request_hash: str,
+        operation: Callable[[], Awaitable[StoredResponse]],
+    ) -> Tuple[StoredResponse, bool]:
+        return await self.service.execute(self.db, user_id, key, request_hash, operation)
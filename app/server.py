@@ -0,0 +1,133 @@
+"""
+Production entrypoint.
+
+Runs pending migrations once (see `app.db.migrate`), then starts uvicorn with
+one worker per CPU core on uvloop and httptools:
+
+    python -m app.server                      # WEB_CONCURRENCY workers (default: CPU count)
+    python -m app.server --workers 4 --skip-migrations
+
+Send SIGHUP to the server process to restart the workers one at a time
+(graceful reload, e.g. after a config change); SIGTERM drains in-flight
+requests for up to SERVER_GRACEFUL_TIMEOUT_SECONDS before exiting.
+
+Every worker has its own connection pool, so the per-worker pool is sized from
+DB_CONNECTION_BUDGET, the number of connections all workers may hold together
+(keep it below Postgres' max_connections minus what other clients need). The
+background jobs of a worker (outbox claim loops, outbox metrics, idempotency
+key purge, archival) share its pool and are counted in its share. Processes
+started separately, such as `python -m app.jobs.outbox_worker` or the
+migration run before the workers start, have pools of their own outside the
+budget.
+"""
+import argparse
+import asyncio
+import logging
+import os
+from typing import Tuple
+
+import uvicorn
+
+from app.core.config import settings
+from app.core.logging_config import setup_logging
+from app.db.migrate import upgrade_to_head
+
+logger = logging.getLogger(__name__)
+
+
+def worker_count() -> int:
+    return settings.WEB_CONCURRENCY or os.cpu_count() or 1
+
+
+def background_connections() -> int:
+    """Connections the background jobs of one worker may hold at the same time."""
+    if not settings.BACKGROUND_JOBS_ENABLED or settings.STORAGE_BACKEND == "memory":
+        return 0
+    # Each periodic job and each outbox claim loop uses one session at a time
+    count = 1  # purge-idempotency-keys
+    if settings.TASK_ARCHIVE_ENABLED:
+        count += 1
+    if settings.OUTBOX_ENABLED and settings.OUTBOX_WORKER_ENABLED:
+        count += settings.OUTBOX_WORKERS + 1  # claim loops and outbox-metrics
+    return count
+
+
+def pool_sizing(budget: int, workers: int, background: int = 0) -> Tuple[int, int]:
+    """
+    Split a connection budget between workers: (pool_size, max_overflow) per worker.
+
+    `background` connections per worker are kept open for its background jobs.
+    Two thirds of the rest of each worker's share are kept open for requests;
+    the remainder is overflow that is only opened under bursts and closed
+    again when returned.
+    """
+    per_worker = max(1, budget // workers)
+    if budget < workers:
+        logger.warning(
+            "DB_CONNECTION_BUDGET=%d is smaller than the number of workers (%d); "
+            "each worker still gets one connection", budget, workers,
+        )
+    for_requests = per_worker - background
+    if for_requests < 1:
+        logger.warning(
+            "Each worker's share of DB_CONNECTION_BUDGET (%d) leaves no connection for requests "
+            "next to its %d background job connections; requests will wait for them",
+            per_worker, background,
+        )
+        return per_worker, 0
+    pool_size = background + max(1, for_requests * 2 // 3)
+    return pool_size, per_worker - pool_size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the API with multiple uvicorn workers")
+    parser.add_argument("--workers", type=int, default=worker_count())
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--skip-migrations", action="store_true")
+    args = parser.parse_args()
+
+    setup_logging()
+
+    if not args.skip_migrations:
+        if not asyncio.run(upgrade_to_head()):
+            logger.info("Database already at head, skipping migrations")
+
+    # Workers are separate processes that read their settings from the
+    # environment, so pass the derived pool size down that way. A single
+    # worker is served in this process with the settings already loaded, so
+    # update those too. Values set explicitly (environment or .env) win.
+    pool_size, max_overflow = pool_sizing(
+        settings.DB_CONNECTION_BUDGET, args.workers, background_connections()
+    )
+    for name, value in (("DB_POOL_SIZE", pool_size), ("DB_MAX_OVERFLOW", max_overflow)):
+        if name in settings.model_fields_set:
+            logger.info("%s=%s is set explicitly, not derived from DB_CONNECTION_BUDGET", name, getattr(settings, name))
+        else:
+            os.environ[name] = str(value)
+            setattr(settings, name, value)
+    logger.info(
+        "Starting %d workers with pool_size=%s max_overflow=%s",
+        args.workers,
+        settings.DB_POOL_SIZE,
+        settings.DB_MAX_OVERFLOW,
+    )
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop="uvloop",
+        http="httptools",
+        proxy_headers=True,
+        # Logging is set up by the app's lifespan in each worker (JSON, off the
+        # event loop); requests are logged by RequestIDMiddleware
+        log_config=None,
+        access_log=False,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import List
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.task import Task
+from app.models.task_archive import TaskArchive
+
+ARCHIVED_COLUMNS = (
+    "id", "title", "description", "status", "owner_id",
+    "created_at", "updated_at", "is_deleted", "deleted_at",
+)
+
+
+class TaskArchiveService:
+
+    async def archive_batch(
+        self, db: AsyncSession, deleted_before: datetime, after_id: int, batch_size: int
+    ) -> List[int]:
+        """
+        Move one batch of tasks soft-deleted before `deleted_before` into
+        `tasks_archive` and hard-delete them, in a single statement.
+
+        Candidates are taken in id order after `after_id` (keyset pagination),
+        skipping rows locked by concurrent writers. Returns the moved ids.
+        """
+        batch = (
+            select(Task.id)
+            .where(
+                Task.is_deleted == True,
+                Task.deleted_at < deleted_before,
+                Task.id > after_id,
+            )
+            .order_by(Task.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .cte("batch")
+        )
+        moved = (
+            delete(Task)
+            .where(Task.id.in_(select(batch.c.id)))
+            .returning(*(getattr(Task, name) for name in ARCHIVED_COLUMNS))
+            .cte("moved")
+        )
+        stmt = (
+            insert(TaskArchive)
+            .from_select(ARCHIVED_COLUMNS, select(*(moved.c[name] for name in ARCHIVED_COLUMNS)))
+            .returning(TaskArchive.id)
+        )
+
+        result = await db.execute(stmt)
+        moved_ids = list(result.scalars().all())
+        await db.commit()
+        return moved_ids
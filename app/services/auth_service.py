@@ -1,22 +1,19 @@
 from typing import Optional
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
 from app.core import security
+from app.repositories.base import UserRepository
 
 
 class AuthService:
 
-    async def get_user_by_email(self, db: AsyncSession, email: str) -> Optional[User]:
-        stmt = select(User).where(User.email == email)
-        result = await db.execute(stmt)
-        return result.scalars().first()
+    async def get_user_by_email(self, users: UserRepository, email: str) -> Optional[User]:
+        return await users.get_by_email(email)
 
     async def authenticate_user(
-        self, db: AsyncSession, email: str, password: str
+        self, users: UserRepository, email: str, password: str
     ) -> Optional[User]:
-        user = await self.get_user_by_email(db, email)
+        user = await self.get_user_by_email(users, email)
         
         if not user:
             return None
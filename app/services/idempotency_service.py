@@ -0,0 +1,284 @@
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from sqlalchemy import select, delete, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import atomic
+from app.models.idempotency_key import IdempotencyKey, IdempotencyStatus
+from app.repositories.base import StoredResponse
+
+
+class IdempotencyKeyReusedError(Exception):
+    """The key was already used for a request with a different fingerprint."""
+
+
+class IdempotencyKeyInProgressError(Exception):
+    """The original request is still running and did not finish in time."""
+
+
+class IdempotencyKeyLostError(IdempotencyKeyInProgressError):
+    """The key was taken over by a retry while this request was still running."""
+
+
+class IdempotencyService:
+    """
+    Stores the first response for each (user, Idempotency-Key) pair and replays
+    it on retries.
+
+    Ownership of a key is claimed with INSERT ... ON CONFLICT DO NOTHING in its
+    own short transaction, so duplicates see the in-progress row immediately
+    instead of blocking on the unique index. Duplicates in the same worker wait
+    on an asyncio.Event; duplicates in other workers poll the row.
+
+    The write and the stored response are committed in one transaction, and
+    only while the claim still holds (its `updated_at` is unchanged), so a
+    crash can never leave a committed write behind an in-progress key.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Tuple[int, str], asyncio.Event] = {}
+
+    @staticmethod
+    def fingerprint(method: str, path: str, body: bytes) -> str:
+        digest = hashlib.sha256()
+        digest.update(method.encode())
+        digest.update(b"\0")
+        digest.update(path.encode())
+        digest.update(b"\0")
+        digest.update(body)
+        return digest.hexdigest()
+
+    async def get_key(
+        self, db: AsyncSession, user_id: int, key: str
+    ) -> Optional[IdempotencyKey]:
+        stmt = (
+            select(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            .execution_options(populate_existing=True)
+        )
+        result = await db.execute(stmt)
+        return result.scalars().first()
+
+    async def claim(
+        self, db: AsyncSession, user_id: int, key: str, request_hash: str
+    ) -> Tuple[Optional[datetime], Optional[IdempotencyKey]]:
+        """
+        Try to become the owner of `key`. Returns (lease, None) when claimed,
+        where `lease` identifies this claim, otherwise (None, existing_record).
+        """
+        now = datetime.now(timezone.utc)
+        stmt = (
+            insert(IdempotencyKey)
+            .values(
+                user_id=user_id,
+                key=key,
+                request_hash=request_hash,
+                status=IdempotencyStatus.IN_PROGRESS.value,
+                expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "key"])
+            .returning(IdempotencyKey.updated_at)
+        )
+        result = await db.execute(stmt)
+        lease = result.scalar()
+        await db.commit()
+        if lease is not None:
+            return lease, None
+
+        record = await self.get_key(db, user_id, key)
+        if record is None:
+            # Released between our insert and select; try again.
+            return await self.claim(db, user_id, key, request_hash)
+
+        if record.expires_at <= now or self._is_abandoned(record, now):
+            # Expired or left behind by a crashed owner: take it over.
+            takeover = (
+                update(IdempotencyKey)
+                .where(
+                    IdempotencyKey.id == record.id,
+                    IdempotencyKey.updated_at == record.updated_at,
+                )
+                .values(
+                    request_hash=request_hash,
+                    status=IdempotencyStatus.IN_PROGRESS.value,
+                    response_status=None,
+                    response_body=None,
+                    expires_at=now + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS),
+                    updated_at=now,
+                )
+                .returning(IdempotencyKey.updated_at)
+            )
+            result = await db.execute(takeover)
+            lease = result.scalar()
+            await db.commit()
+            if lease is not None:
+                return lease, None
+            record = await self.get_key(db, user_id, key)
+
+        return None, record
+
+    @staticmethod
+    def _is_abandoned(record: IdempotencyKey, now: datetime) -> bool:
+        if record.status != IdempotencyStatus.IN_PROGRESS.value:
+            return False
+        lock_timeout = timedelta(seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS)
+        return record.updated_at + lock_timeout <= now
+
+    async def complete(
+        self, db: AsyncSession, user_id: int, key: str, lease: datetime, response: StoredResponse
+    ) -> bool:
+        """
+        Store the response in the current transaction (the caller commits).
+
+        Returns False when the claim identified by `lease` no longer holds.
+        The row lock taken here makes a concurrent takeover wait for the
+        caller's commit, after which it no longer matches.
+        """
+        status_code, body = response
+        stmt = (
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status == IdempotencyStatus.IN_PROGRESS.value,
+                IdempotencyKey.updated_at == lease,
+            )
+            .values(
+                status=IdempotencyStatus.COMPLETED.value,
+                response_status=status_code,
+                response_body=body,
+            )
+            .returning(IdempotencyKey.id)
+        )
+        result = await db.execute(stmt)
+        return result.scalar() is not None
+
+    async def release(self, db: AsyncSession, user_id: int, key: str) -> None:
+        """Forget an in-progress key so the client can retry after a failure."""
+        await db.rollback()
+        stmt = delete(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.status == IdempotencyStatus.IN_PROGRESS.value,
+        )
+        await db.execute(stmt)
+        await db.commit()
+
+    async def wait_for_completion(
+        self, db: AsyncSession, user_id: int, key: str
+    ) -> Optional[IdempotencyKey]:
+        """
+        Wait until the owner of `key` finishes. Returns the completed record,
+        or None if the owner released the key (its request failed).
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.IDEMPOTENCY_WAIT_TIMEOUT_SECONDS
+        delay = 0.05
+
+        while True:
+            event = self._inflight.get((user_id, key))
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise IdempotencyKeyInProgressError(key)
+
+            if event is not None:
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    raise IdempotencyKeyInProgressError(key)
+            else:
+                await asyncio.sleep(min(delay, remaining))
+                delay = min(delay * 2, 0.5)
+
+            record = await self.get_key(db, user_id, key)
+            if record is None:
+                return None
+            if record.status == IdempotencyStatus.COMPLETED.value:
+                return record
+
+    async def execute(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        key: str,
+        request_hash: str,
+        operation: Callable[[], Awaitable[StoredResponse]],
+    ) -> Tuple[StoredResponse, bool]:
+        """
+        Run `operation` at most once per (user, key).
+
+        Returns the response and whether it was replayed from storage.
+        """
+        while True:
+            lease, record = await self.claim(db, user_id, key, request_hash)
+
+            if lease is not None:
+                event = asyncio.Event()
+                self._inflight[(user_id, key)] = event
+                try:
+                    return await self._run_claimed(db, user_id, key, lease, operation), False
+                finally:
+                    self._inflight.pop((user_id, key), None)
+                    event.set()
+
+            if record.request_hash != request_hash:
+                raise IdempotencyKeyReusedError(key)
+
+            if record.status != IdempotencyStatus.COMPLETED.value:
+                record = await self.wait_for_completion(db, user_id, key)
+                if record is None:
+                    # The original request failed; run this one instead.
+                    continue
+
+            return (record.response_status, record.response_body), True
+
+    async def _run_claimed(
+        self,
+        db: AsyncSession,
+        user_id: int,
+        key: str,
+        lease: datetime,
+        operation: Callable[[], Awaitable[StoredResponse]],
+    ) -> StoredResponse:
+        try:
+            # Writes made by the operation are only flushed; they commit
+            # together with the stored response below
+            async with atomic(db):
+                response = await operation()
+                completed = await self.complete(db, user_id, key, lease, response)
+                if not completed:
+                    await db.rollback()
+                    raise IdempotencyKeyLostError(key)
+                await db.commit()
+        except IdempotencyKeyLostError:
+            raise
+        except Exception:
+            await self.release(db, user_id, key)
+            raise
+        # On cancellation nothing is awaited: the uncommitted write is rolled
+        # back with the session and the key becomes claimable once
+        # IDEMPOTENCY_LOCK_TIMEOUT_SECONDS have passed.
+        return response
+
+    async def purge_expired(self, db: AsyncSession, batch_size: int) -> int:
+        """Delete up to `batch_size` expired keys. Returns the number deleted."""
+        expired_ids = (
+            select(IdempotencyKey.id)
+            .where(IdempotencyKey.expires_at < datetime.now(timezone.utc))
+            .order_by(IdempotencyKey.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = delete(IdempotencyKey).where(IdempotencyKey.id.in_(expired_ids.scalar_subquery()))
+        result = await db.execute(stmt)
+        await db.commit()
+        return result.rowcount or 0
+
+
+# Shared by all requests of the process: duplicates of an in-flight request
+# wait on the event its owner registered here
+idempotency_service = IdempotencyService()
@@ -0,0 +1,131 @@
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.outbox import OutboxJob, OutboxStatus
+
+# Topics enqueued by the task repository
+TASK_CREATED = "task.created"
+TASK_UPDATED = "task.updated"
+TASK_DELETED = "task.deleted"
+
+_pending = OutboxJob.status == OutboxStatus.PENDING.value
+
+
+@dataclass
+class ClaimedJob:
+    id: int
+    topic: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+class OutboxService:
+    """
+    Transactional outbox.
+
+    `enqueue` only adds the row to the caller's session, so the job is
+    committed (or rolled back) together with the write that caused it. The
+    other methods are used by the worker and commit their own short
+    transactions; no lock is held while handlers run.
+    """
+
+    @staticmethod
+    def enqueue(db: AsyncSession, topic: str, payload: Dict[str, Any]) -> OutboxJob:
+        job = OutboxJob(topic=topic, payload=payload, status=OutboxStatus.PENDING.value, attempts=0)
+        db.add(job)
+        return job
+
+    async def claim_batch(
+        self, db: AsyncSession, batch_size: int, lease_seconds: float
+    ) -> List[ClaimedJob]:
+        """
+        Claim up to `batch_size` due jobs, oldest first.
+
+        Rows locked by another worker's claim are skipped. Claiming counts an
+        attempt and moves `available_at` past the lease, so a job whose worker
+        dies is picked up again once the lease expires.
+        """
+        due = (
+            select(OutboxJob.id)
+            .where(_pending, OutboxJob.available_at <= func.now())
+            .order_by(OutboxJob.available_at, OutboxJob.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .cte("due")
+        )
+        stmt = (
+            update(OutboxJob)
+            .where(OutboxJob.id.in_(select(due.c.id)))
+            .values(
+                attempts=OutboxJob.attempts + 1,
+                available_at=func.now() + timedelta(seconds=lease_seconds),
+            )
+            .returning(OutboxJob.id, OutboxJob.topic, OutboxJob.payload, OutboxJob.attempts)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(stmt)
+        jobs = [ClaimedJob(*row) for row in result.all()]
+        await db.commit()
+        return jobs
+
+    async def complete(self, db: AsyncSession, jobs: Sequence[ClaimedJob]) -> int:
+        """
+        Delete jobs whose handler succeeded. Returns the number deleted.
+
+        Like `retry` and `dead_letter`, only matches a job while the claim
+        holds: a job claimed again after its lease expired has more attempts.
+        """
+        if not jobs:
+            return 0
+        stmt = delete(OutboxJob).where(
+            tuple_(OutboxJob.id, OutboxJob.attempts).in_([(job.id, job.attempts) for job in jobs]),
+            _pending,
+        )
+        result = await db.execute(stmt)
+        return result.rowcount
+
+    async def retry(self, db: AsyncSession, job: ClaimedJob, delay: float, error: str) -> bool:
+        stmt = (
+            update(OutboxJob)
+            .where(OutboxJob.id == job.id, OutboxJob.attempts == job.attempts, _pending)
+            .values(available_at=func.now() + timedelta(seconds=delay), last_error=error)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(stmt)
+        return result.rowcount == 1
+
+    async def dead_letter(self, db: AsyncSession, job: ClaimedJob, error: str) -> bool:
+        """Park a job that will not be retried; it stays in the table for inspection."""
+        stmt = (
+            update(OutboxJob)
+            .where(OutboxJob.id == job.id, OutboxJob.attempts == job.attempts, _pending)
+            .values(status=OutboxStatus.DEAD.value, last_error=error)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(stmt)
+        return result.rowcount == 1
+
+    async def queue_depth(self, db: AsyncSession) -> Dict[str, Any]:
+        """
+        Pending jobs that are due, pending jobs that are scheduled for later
+        (retries and leased jobs), dead jobs and the age of the oldest due job.
+        """
+        due = _pending & (OutboxJob.available_at <= func.now())
+        stmt = select(
+            func.count().filter(due),
+            func.count().filter(_pending & (OutboxJob.available_at > func.now())),
+            func.count().filter(OutboxJob.status == OutboxStatus.DEAD.value),
+            func.extract("epoch", func.now() - func.min(OutboxJob.created_at).filter(due)),
+        )
+        ready, scheduled, dead, oldest_age = (await db.execute(stmt)).one()
+        await db.rollback()
+        return {
+            "ready": ready,
+            "scheduled": scheduled,
+            "dead": dead,
+            "oldest_ready_age_seconds": round(float(oldest_age), 3) if oldest_age is not None else None,
+        }
@@ -0,0 +1,150 @@
+"""
+Synthetic data generator for load tests.
+
+Creates N users (`loadtest-<i>@example.com`, all sharing one password) with M
+tasks each. Status, description size, age and soft-deletion follow fixed
+distributions so runs are reproducible for a given seed:
+
+    python -m benchmarks.datagen --users 100 --tasks-per-user 1000
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db.base import IdempotencyKey, OutboxJob, Task, TaskArchive, User
+
+EMAIL_TEMPLATE = "loadtest-{}@example.com"
+EMAIL_PATTERN = "loadtest-%@example.com"
+DEFAULT_PASSWORD = "loadtest"
+
+STATUS_WEIGHTS = {"pending": 0.5, "in_progress": 0.2, "done": 0.3}
+DELETED_RATIO = 0.05
+NO_DESCRIPTION_RATIO = 0.3
+WORDS = (
+    "review deploy fix update write test refactor schedule call plan check "
+    "migrate document release design measure clean prepare send verify"
+).split()
+
+
+def random_description(rng: random.Random) -> Optional[str]:
+    if rng.random() < NO_DESCRIPTION_RATIO:
+        return None
+    # Log-normal length: mostly a sentence or two, with a long tail of notes
+    length = min(20_000, int(rng.lognormvariate(5.0, 1.2)))
+    words = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def task_rows(rng: random.Random, owner_id: int, count: int, now: datetime) -> List[dict]:
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    rows = []
+    for i in range(count):
+        created_at = now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+        deleted = rng.random() < DELETED_RATIO
+        rows.append({
+            "title": f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} #{i}",
+            "description": random_description(rng),
+            "status": rng.choices(statuses, weights)[0],
+            "owner_id": owner_id,
+            "created_at": created_at,
+            "updated_at": created_at,
+            "is_deleted": deleted,
+            "deleted_at": now if deleted else None,
+        })
+    return rows
+
+
+async def reset(conn: AsyncConnection) -> None:
+    user_ids = select(User.id).where(User.email.like(EMAIL_PATTERN))
+    await conn.execute(delete(IdempotencyKey).where(IdempotencyKey.user_id.in_(user_ids)))
+    # Jobs enqueued by task writes during a load test carry the owner in their payload
+    await conn.execute(delete(OutboxJob).where(OutboxJob.payload["owner_id"].as_integer().in_(user_ids)))
+    await conn.execute(delete(Task).where(Task.owner_id.in_(user_ids)))
+    await conn.execute(delete(TaskArchive).where(TaskArchive.owner_id.in_(user_ids)))
+    await conn.execute(delete(User).where(User.email.like(EMAIL_PATTERN)))
+
+
+async def generate(users: int, tasks_per_user: int, seed: int, chunk_size: int = 5000) -> None:
+    rng = random.Random(seed)
+    engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI)
+    # bcrypt is deliberately slow; hash once and share it between all users
+    hashed_password = get_password_hash(DEFAULT_PASSWORD)
+    now = datetime.now(timezone.utc)
+    started = time.perf_counter()
+
+    async with engine.begin() as conn:
+        # Replace any data from a previous run
+        await reset(conn)
+
+        result = await conn.execute(
+            insert(User).returning(User.id),
+            [
+                {"email": EMAIL_TEMPLATE.format(i), "hashed_password": hashed_password, "is_active": True}
+                for i in range(users)
+            ],
+        )
+        user_ids = list(result.scalars().all())
+
+    inserted = 0
+    buffer: List[dict] = []
+    async with engine.connect() as conn:
+        for owner_id in user_ids:
+            buffer.extend(task_rows(rng, owner_id, tasks_per_user, now))
+            while len(buffer) >= chunk_size:
+                await conn.execute(insert(Task), buffer[:chunk_size])
+                await conn.commit()
+                inserted += chunk_size
+                buffer = buffer[chunk_size:]
+                print(f"  {inserted} tasks ({inserted / (time.perf_counter() - started):.0f} rows/s)", flush=True)
+        if buffer:
+            await conn.execute(insert(Task), buffer)
+            await conn.commit()
+            inserted += len(buffer)
+        await conn.exec_driver_sql("ANALYZE tasks")
+
+    await engine.dispose()
+    print(f"Created {len(user_ids)} users and {inserted} tasks in {time.perf_counter() - started:.1f}s")
+
+
+def populate_memory_store(users: int, tasks_per_user: int, seed: int) -> None:
+    """Load the same synthetic data into the in-memory repositories (STORAGE_BACKEND=memory)."""
+    from app.repositories.memory import store
+
+    rng = random.Random(seed)
+    hashed_password = get_password_hash(DEFAULT_PASSWORD)
+    now = datetime.now(timezone.utc)
+    store.clear()
+    for i in range(users):
+        user = store.add_user(EMAIL_TEMPLATE.format(i), hashed_password)
+        for row in task_rows(rng, user.id, tasks_per_user, now):
+            row.pop("owner_id")
+            store.add_task(user.id, **row)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate synthetic users and tasks for load tests")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--tasks-per-user", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    asyncio.run(generate(args.users, args.tasks_per_user, args.seed, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
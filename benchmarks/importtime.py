@@ -0,0 +1,161 @@
+"""
+Cold-start guard based on `python -X importtime`.
+
+Imports the app in fresh interpreters, reports the cumulative import time of
+`app.main` and the heaviest top-level packages, and fails when the import got
+slower than the baseline or pulled in a module that should only be loaded on
+demand:
+
+    python -m benchmarks.importtime --save-baseline    # record a new baseline
+    python -m benchmarks.importtime --threshold 15     # fail if >15% slower
+
+The best of `--runs` interpreters is used; the first one also warms the
+bytecode cache.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from benchmarks.stats import load_json, regression_pct, save_json
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_OUTPUT = RESULTS_DIR / "importtime.json"
+DEFAULT_BASELINE = RESULTS_DIR / "importtime-baseline.json"
+ROOT = Path(__file__).resolve().parents[1]
+
+TARGET = "app.main"
+# Loaded lazily: by the engine, the lifespan or only when a feature is enabled
+MUST_NOT_IMPORT = (
+    "asyncpg",
+    "alembic",
+    "cProfile",
+    "app.core.profiling",
+    "app.jobs.scheduler",
+)
+
+PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import {TARGET}
+imported = time.perf_counter()
+{TARGET}.create_app()
+created = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "modules": sorted(sys.modules),
+}}))
+"""
+
+
+def parse_importtime(stderr: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Return ({module: cumulative us}, {top-level package: summed self us})."""
+    cumulative = {}
+    by_package: Dict[str, int] = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        cumulative[name] = int(cumulative_us)
+        by_package[name.split(".")[0]] += int(self_us)
+    return cumulative, dict(by_package)
+
+
+def probe() -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    cumulative, by_package = parse_importtime(proc.stderr)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["importtime_ms"] = cumulative[TARGET] / 1000
+    result["packages_ms"] = {name: us / 1000 for name, us in by_package.items()}
+    return result
+
+
+def run(runs: int) -> dict:
+    samples = [probe() for _ in range(runs)]
+    best = min(samples, key=lambda sample: sample["importtime_ms"])
+    return {
+        "importtime_ms": round(best["importtime_ms"], 1),
+        "import_ms": round(min(sample["import_ms"] for sample in samples), 1),
+        "create_app_ms": round(min(sample["create_app_ms"] for sample in samples), 1),
+        "packages_ms": {
+            name: round(ms, 1)
+            for name, ms in sorted(best["packages_ms"].items(), key=lambda item: -item[1])
+        },
+        "modules": best["modules"],
+    }
+
+
+def forbidden_imports(modules: List[str]) -> List[str]:
+    return [
+        name for name in MUST_NOT_IMPORT
+        if any(module == name or module.startswith(name + ".") for module in modules)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure and guard the app's import time")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to sample")
+    parser.add_argument("--top", type=int, default=15, help="Packages to list")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT))
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="Fail when the import is this many percent slower than the baseline")
+    args = parser.parse_args()
+
+    # One throwaway run so every sample sees a warm bytecode cache
+    probe()
+    results = run(args.runs)
+
+    print(f"{TARGET} import (-X importtime): {results['importtime_ms']} ms")
+    print(f"{TARGET} import (wall clock):    {results['import_ms']} ms")
+    print(f"create_app():                  {results['create_app_ms']} ms")
+    print(f"\n{'package':<28} {'self ms':>9}")
+    for name, ms in list(results["packages_ms"].items())[:args.top]:
+        print(f"{name:<28} {ms:>9}")
+
+    failures = []
+    unexpected = forbidden_imports(results["modules"])
+    if unexpected:
+        failures.append(f"imported at startup but should be lazy: {', '.join(unexpected)}")
+
+    payload = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        **{key: value for key, value in results.items() if key != "modules"},
+    }
+    RESULTS_DIR.mkdir(exist_ok=True)
+    save_json(args.output, payload)
+
+    if args.save_baseline:
+        save_json(args.baseline, payload)
+        print(f"\nBaseline saved to {args.baseline}")
+    else:
+        baseline = load_json(args.baseline) if Path(args.baseline).exists() else None
+        if baseline is None:
+            print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        else:
+            change = regression_pct(results["importtime_ms"], baseline["importtime_ms"])
+            print(f"\nbaseline: {baseline['importtime_ms']} ms ({change:+.1f}%)")
+            if change > args.threshold:
+                failures.append(f"import is {change:.1f}% slower than the baseline")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
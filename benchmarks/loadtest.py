@@ -0,0 +1,264 @@
+"""
+Scripted async load driver.
+
+Simulates concurrent clients, each logged in as one of the users created by
+`benchmarks.datagen`, issuing a weighted mix of login, list (shallow and deep
+pages), get, create, update and delete requests. Runs the app in-process
+through ASGI by default, or against a running server with `--base-url`:
+
+    python -m benchmarks.loadtest --mix read-heavy --concurrency 32 --duration 30 \\
+        --output results.json --baseline baseline.json
+
+Rate limiting and load shedding are disabled for in-process runs (unless
+`--keep-limits` is given), since they would measure the limiters rather than
+the app; disable them on the server for `--base-url` runs.
+
+`--storage memory` runs the in-process app on the in-memory repositories,
+filled with the same synthetic data, as a zero-I/O baseline for the API layer.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.datagen import DEFAULT_PASSWORD, EMAIL_TEMPLATE
+from benchmarks.stats import load_json, regression_pct, save_json, summarize
+
+API = "/api/v1"
+
+MIXES: Dict[str, Dict[str, int]] = {
+    "read-heavy": {
+        "login": 1, "list_shallow": 40, "list_deep": 10, "get": 35,
+        "create": 8, "update": 5, "delete": 1,
+    },
+    "balanced": {
+        "login": 2, "list_shallow": 25, "list_deep": 8, "get": 25,
+        "create": 20, "update": 15, "delete": 5,
+    },
+    "write-heavy": {
+        "login": 2, "list_shallow": 10, "list_deep": 3, "get": 15,
+        "create": 35, "update": 25, "delete": 10,
+    },
+}
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    def record(self, op: str, status_code: int, elapsed_ms: float) -> None:
+        self.latencies[op].append(elapsed_ms)
+        self.statuses[op][status_code] += 1
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, email: str, rng: random.Random, recorder: Recorder):
+        self.client = client
+        self.email = email
+        self.rng = rng
+        self.recorder = recorder
+        self.headers: Dict[str, str] = {}
+        self.task_ids: List[int] = []
+        self.pages = 1
+
+    async def request(self, op: str, method: str, url: str, **kwargs) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        self.recorder.record(op, response.status_code, (time.perf_counter() - start) * 1000)
+        return response
+
+    async def login(self) -> None:
+        response = await self.request(
+            "login", "POST", f"{API}/auth/login",
+            json={"username": self.email, "password": DEFAULT_PASSWORD},
+        )
+        if response.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+
+    async def list_page(self, op: str, page: int) -> None:
+        response = await self.request(op, "GET", f"{API}/tasks/", params={"page": page, "size": 10})
+        if response.status_code == 200:
+            data = response.json()["data"]
+            self.pages = max(1, data["pagination"]["pages"])
+            if page == 1:
+                self.task_ids = [item["id"] for item in data["items"]] or self.task_ids
+
+    async def run_op(self, op: str) -> None:
+        if op == "login":
+            await self.login()
+        elif op == "list_shallow" or (not self.task_ids and op in ("get", "update", "delete")):
+            await self.list_page("list_shallow", 1)
+        elif op == "list_deep":
+            await self.list_page("list_deep", self.rng.randint(max(1, self.pages // 2), self.pages))
+        elif op == "get":
+            await self.request("get", "GET", f"{API}/tasks/{self.rng.choice(self.task_ids)}")
+        elif op == "create":
+            response = await self.request(
+                "create", "POST", f"{API}/tasks/",
+                json={"title": f"load test {self.rng.random():.6f}", "description": "x" * self.rng.randint(0, 500)},
+            )
+            if response.status_code == 201:
+                self.task_ids.append(response.json()["data"]["id"])
+        elif op == "update":
+            await self.request(
+                "update", "PUT", f"{API}/tasks/{self.rng.choice(self.task_ids)}",
+                json={"status": self.rng.choice(["pending", "in_progress", "done"])},
+            )
+        elif op == "delete":
+            task_id = self.task_ids.pop(self.rng.randrange(len(self.task_ids)))
+            await self.request("delete", "DELETE", f"{API}/tasks/{task_id}")
+
+
+async def worker(
+    client: httpx.AsyncClient, email: str, mix: Dict[str, int], seed: int,
+    deadline: float, recorder: Recorder,
+) -> None:
+    rng = random.Random(seed)
+    user = VirtualUser(client, email, rng, recorder)
+    await user.login()
+    ops = list(mix)
+    weights = list(mix.values())
+    while time.perf_counter() < deadline:
+        await user.run_op(rng.choices(ops, weights)[0])
+
+
+async def run(args: argparse.Namespace) -> dict:
+    mix = MIXES[args.mix]
+    recorder = Recorder()
+
+    if args.base_url:
+        transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.concurrency))
+        base_url = args.base_url
+        lifespan = None
+    else:
+        from app.core.config import settings
+
+        if not args.keep_limits:
+            # Middleware is registered when app.main is imported
+            settings.RATE_LIMIT_ENABLED = False
+            settings.LOAD_SHED_ENABLED = False
+        # Access records would be interleaved with the report
+        settings.LOG_LEVEL = "WARNING"
+        if args.storage == "memory":
+            from benchmarks.datagen import populate_memory_store
+
+            settings.STORAGE_BACKEND = "memory"
+            populate_memory_store(args.users, args.tasks_per_user, args.seed)
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+        lifespan = app.router.lifespan_context(app)
+
+    async def drive() -> float:
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as client:
+            if args.warmup > 0:
+                warmup_deadline = time.perf_counter() + args.warmup
+                await asyncio.gather(*(
+                    worker(client, EMAIL_TEMPLATE.format(i % args.users), mix, args.seed + i, warmup_deadline, Recorder())
+                    for i in range(args.concurrency)
+                ))
+
+            started = time.perf_counter()
+            deadline = started + args.duration
+            await asyncio.gather(*(
+                worker(client, EMAIL_TEMPLATE.format(i % args.users), mix, args.seed + i, deadline, recorder)
+                for i in range(args.concurrency)
+            ))
+            return time.perf_counter() - started
+
+    if lifespan is not None:
+        async with lifespan:
+            elapsed = await drive()
+    else:
+        elapsed = await drive()
+
+    total = sum(len(samples) for samples in recorder.latencies.values())
+    return {
+        "params": {
+            "mix": args.mix,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "users": args.users,
+            "target": args.base_url or "in-process",
+            "storage": args.storage,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "total_requests": total,
+        "rps": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+        "operations": {
+            op: {
+                **summarize(samples),
+                "statuses": {str(code): count for code, count in sorted(recorder.statuses[op].items())},
+            }
+            for op, samples in sorted(recorder.latencies.items())
+        },
+    }
+
+
+def print_report(results: dict, baseline: Optional[dict]) -> List[Tuple[str, float]]:
+    """Print the results table and return (operation, p95 change %) vs the baseline."""
+    regressions = []
+    print(f"\n{results['total_requests']} requests in {results['elapsed_s']}s = {results['rps']} req/s")
+    if baseline:
+        delta = regression_pct(results["rps"], baseline["rps"])
+        print(f"baseline: {baseline['rps']} req/s ({delta:+.1f}%)")
+
+    print(f"\n{'operation':<14} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  statuses")
+    for op, row in results["operations"].items():
+        line = f"{op:<14} {row['count']:>7} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9}  {row['statuses']}"
+        base_row = (baseline or {}).get("operations", {}).get(op)
+        if base_row:
+            change = regression_pct(row["p95_ms"], base_row["p95_ms"])
+            line += f"  p95 {change:+.1f}%"
+            regressions.append((op, change))
+        print(line)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a scripted load test against the API")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="read-heavy")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before the run")
+    parser.add_argument("--users", type=int, default=50, help="Number of users created by benchmarks.datagen")
+    parser.add_argument("--base-url", help="Target a running server instead of the in-process app")
+    parser.add_argument("--storage", choices=["sqlalchemy", "memory"], default="sqlalchemy",
+                        help="Repositories used by the in-process app")
+    parser.add_argument("--tasks-per-user", type=int, default=500,
+                        help="Tasks per user generated for --storage memory")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--keep-limits", action="store_true",
+                        help="Keep rate limiting and load shedding enabled for in-process runs")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument("--max-regression", type=float, default=None,
+                        help="Exit with status 1 if any p95 regresses by more than this many percent")
+    args = parser.parse_args()
+    if args.base_url and args.storage == "memory":
+        parser.error("--storage memory only applies to the in-process app")
+
+    results = asyncio.run(run(args))
+    regressions = print_report(results, load_json(args.baseline))
+
+    if args.output:
+        save_json(args.output, results)
+
+    if args.max_regression is not None:
+        failed = [(op, change) for op, change in regressions if change > args.max_regression]
+        for op, change in failed:
+            print(f"REGRESSION: {op} p95 is {change:.1f}% slower than baseline", file=sys.stderr)
+        if failed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,545 @@
+"""
+Micro-benchmarks for the request hot path.
+
+Times individual components in isolation (no database server, no network) so CPU
+regressions show up even when end-to-end numbers are noisy:
+
+    python -m benchmarks.micro                      # run and store results
+    python -m benchmarks.micro --save-baseline      # record a new baseline
+    python -m benchmarks.micro --threshold 15       # fail if any case is >15% slower
+    python -m benchmarks.micro -k envelope          # only cases matching a substring
+
+Each case is auto-calibrated to run for about `--min-time` seconds per repeat;
+the fastest repeat is reported as microseconds per call.
+"""
+import argparse
+import asyncio
+import inspect
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks.stats import load_json, regression_pct, save_json
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_OUTPUT = RESULTS_DIR / "micro.json"
+DEFAULT_BASELINE = RESULTS_DIR / "micro-baseline.json"
+
+# name -> factory returning the callable (sync or async) to time
+CASES: Dict[str, Callable[[], Callable]] = {}
+# Coroutine functions releasing what the cases opened, run before the loop closes
+CLEANUPS: List[Callable[[], Awaitable[None]]] = []
+
+
+def case(name: str):
+    def register(factory: Callable[[], Callable]) -> Callable[[], Callable]:
+        CASES[name] = factory
+        return factory
+    return register
+
+
+def make_tasks(count: int) -> list:
+    from app.models.task import Task
+
+    now = datetime.now(timezone.utc)
+    return [
+        Task(id=i, title=f"Task {i}", description="x" * 200, status="pending", owner_id=1, created_at=now)
+        for i in range(count)
+    ]
+
+
+def make_request(path: str = "/api/v1/tasks/", headers: list = ()):
+    from starlette.requests import Request
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "path": path,
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"testserver"), *headers],
+        "state": {"request_id": "bench"},
+    }
+    return Request(scope)
+
+
+# --- security -----------------------------------------------------------------
+
+@case("create_access_token")
+def bench_create_access_token():
+    from app.core.security import create_access_token
+
+    return lambda: create_access_token("bench@example.com")
+
+
+# --- middleware -----------------------------------------------------------------
+
+@case("RequestIDMiddleware.dispatch")
+def bench_request_id_middleware():
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+    from app.core.middleware import RequestIDMiddleware
+
+    async def endpoint(request):
+        return PlainTextResponse("ok")
+
+    app = RequestIDMiddleware(Starlette(routes=[Route("/", endpoint)]))
+    scope = {
+        "type": "http", "method": "GET", "scheme": "http", "server": ("testserver", 80),
+        "path": "/", "root_path": "", "query_string": b"", "headers": [(b"host", b"testserver")],
+        "http_version": "1.1", "client": ("127.0.0.1", 1234),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    async def call():
+        await app(dict(scope), receive, send)
+
+    return call
+
+
+@case("CompressionMiddleware.gzip[100]")
+def bench_compression_gzip_100():
+    from app.core.compression import CompressionMiddleware
+
+    body = _paginated(100)().model_dump_json().encode()
+    length = str(len(body)).encode()
+
+    async def endpoint(scope, receive, send):
+        # Fresh list per response: the middleware edits headers in place
+        headers = [(b"content-type", b"application/json"), (b"content-length", length)]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    app = CompressionMiddleware(endpoint)
+    scope = {
+        "type": "http", "method": "GET", "path": "/",
+        "headers": [(b"accept-encoding", b"gzip, deflate, br")],
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    return lambda: app(scope, receive, send)
+
+
+# --- response envelopes --------------------------------------------------------
+
+def _paginated(count: int):
+    from app.schemas.response import Meta, PaginatedData, PaginatedEnvelope, PaginationMeta
+    from app.schemas.task import Task as TaskSchema
+
+    tasks = make_tasks(count)
+    envelope_type = PaginatedEnvelope[TaskSchema]
+
+    def build():
+        return envelope_type(
+            data=PaginatedData[TaskSchema](
+                items=tasks,
+                pagination=PaginationMeta(page=1, size=count, total=count * 10, pages=10),
+            ),
+            meta=Meta(request_id="bench"),
+        )
+
+    return build
+
+
+@case("PaginatedEnvelope.build[10]")
+def bench_paginated_build_10():
+    return _paginated(10)
+
+
+@case("PaginatedEnvelope.build[100]")
+def bench_paginated_build_100():
+    return _paginated(100)
+
+
+@case("PaginatedEnvelope.serialize[10]")
+def bench_paginated_serialize_10():
+    envelope = _paginated(10)()
+    return envelope.model_dump_json
+
+
+@case("PaginatedEnvelope.serialize[100]")
+def bench_paginated_serialize_100():
+    envelope = _paginated(100)()
+    return envelope.model_dump_json
+
+
+@case("Envelope.build+serialize")
+def bench_envelope():
+    from app.schemas.response import Envelope, Meta
+    from app.schemas.task import Task as TaskSchema
+
+    task = make_tasks(1)[0]
+    envelope_type = Envelope[TaskSchema]
+    return lambda: envelope_type(data=task, meta=Meta(request_id="bench")).model_dump_json()
+
+
+# --- exception handlers ----------------------------------------------------------
+
+@case("http_exception_handler")
+def bench_http_exception_handler():
+    from fastapi import HTTPException
+    from app.core.exceptions import http_exception_handler
+
+    request = make_request()
+    exc = HTTPException(status_code=404, detail="Task with id 1 not found")
+    return lambda: http_exception_handler(request, exc)
+
+
+@case("validation_exception_handler")
+def bench_validation_exception_handler():
+    from fastapi.exceptions import RequestValidationError
+    from app.core.exceptions import validation_exception_handler
+
+    request = make_request()
+    exc = RequestValidationError([
+        {"loc": ("body", "title"), "msg": "Field required", "type": "missing"},
+        {"loc": ("body", "status"), "msg": "Input should be 'pending'", "type": "enum"},
+    ])
+    return lambda: validation_exception_handler(request, exc)
+
+
+# --- TaskService query construction ----------------------------------------------
+#
+# The repository statements from app.repositories.sql, built per call with literal
+# values (how each request used to build them) against the prebuilt ones.
+
+def _task_queries():
+    from app.repositories.sql import count_tasks_query, get_task_query, list_tasks_query
+
+    def build(owner_id: int = 1, page: int = 3, size: int = 10):
+        return (
+            count_tasks_query(owner_id),
+            list_tasks_query(owner_id, (page - 1) * size, size),
+            get_task_query(5, owner_id),
+        )
+
+    return build
+
+
+@case("TaskService.query_build")
+def bench_task_query_build():
+    return _task_queries()
+
+
+@case("TaskService.query_cache_key")
+def bench_task_query_cache_key():
+    # What SQLAlchemy does on every execute() before hitting its compiled cache
+    build = _task_queries()
+
+    def run():
+        for stmt in build():
+            stmt._generate_cache_key()
+
+    return run
+
+
+@case("TaskService.query_compile")
+def bench_task_query_compile():
+    from sqlalchemy.dialects import postgresql
+
+    build = _task_queries()
+    dialect = postgresql.asyncpg.dialect()
+
+    def run():
+        for stmt in build():
+            stmt.compile(dialect=dialect)
+
+    return run
+
+
+@case("TaskService.query_cache_key[prebuilt]")
+def bench_task_query_cache_key_prebuilt():
+    from app.repositories.sql import COUNT_TASKS_STMT, GET_TASK_STMT, LIST_TASKS_STMT
+
+    statements = (COUNT_TASKS_STMT, LIST_TASKS_STMT, GET_TASK_STMT)
+
+    def run():
+        for stmt in statements:
+            stmt._generate_cache_key()
+
+    return run
+
+
+# --- services and repositories ------------------------------------------------------
+#
+# Runs the real services, repositories and dependencies through an AsyncSession on
+# in-memory SQLite (aiosqlite, see requirements-dev.txt), so the numbers cover
+# statement binding, the compiled cache and ORM loading without a database server.
+
+def _sqlite_session():
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import StaticPool
+    from app.db.base import Base, User
+
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session = async_sessionmaker(engine, expire_on_commit=False)()
+        session.add(User(id=1, email="bench@example.com", hashed_password="x", is_active=True))
+        session.add_all(make_tasks(30)[1:])
+        await session.commit()
+        return session
+
+    async def teardown():
+        await session.close()
+        await engine.dispose()
+
+    session = asyncio.get_event_loop().run_until_complete(setup())
+    CLEANUPS.append(teardown)
+    return session
+
+
+@case("security.get_request_subject")
+def bench_get_request_subject():
+    from app.core.security import create_access_token, get_request_subject
+
+    headers = [(b"authorization", f"Bearer {create_access_token('bench@example.com')}".encode())]
+    # A fresh request per call: the subject is cached on the request
+    return lambda: get_request_subject(make_request(headers=headers))
+
+
+@case("deps.get_current_user")
+def bench_get_current_user():
+    from fastapi.security import HTTPAuthorizationCredentials
+    from app.api.deps import get_current_user
+    from app.core.security import create_access_token
+    from app.repositories.sql import SQLAlchemyUserRepository
+
+    users = SQLAlchemyUserRepository(_sqlite_session())
+    token = create_access_token("bench@example.com")
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+    headers = [(b"authorization", f"Bearer {token}".encode())]
+    return lambda: get_current_user(make_request(headers=headers), users, credentials)
+
+
+@case("TaskService.get_tasks[sql]")
+def bench_get_tasks_sql():
+    from app.repositories.sql import SQLAlchemyTaskRepository
+    from app.services.task_service import TaskService
+
+    service = TaskService()
+    tasks = SQLAlchemyTaskRepository(_sqlite_session())
+    return lambda: service.get_tasks(tasks, owner_id=1, page=3, size=10)
+
+
+@case("TaskService.get_task[sql]")
+def bench_get_task_sql():
+    from app.repositories.sql import SQLAlchemyTaskRepository
+    from app.services.task_service import TaskService
+
+    service = TaskService()
+    tasks = SQLAlchemyTaskRepository(_sqlite_session())
+    return lambda: service.get_task(tasks, task_id=5, owner_id=1)
+
+
+@case("TaskService.get_tasks[memory]")
+def bench_get_tasks_memory():
+    from app.repositories.memory import InMemoryTaskRepository, store
+    from app.services.task_service import TaskService
+
+    store.clear()
+    user = store.add_user("bench@example.com", "x")
+    for task in make_tasks(30)[1:]:
+        store.add_task(user.id, title=task.title, description=task.description, status=task.status)
+    service = TaskService()
+    tasks = InMemoryTaskRepository()
+    return lambda: service.get_tasks(tasks, owner_id=user.id, page=3, size=10)
+
+
+@case("AuthService.get_user_by_email[sql]")
+def bench_user_by_email_sql():
+    from app.repositories.sql import SQLAlchemyUserRepository
+    from app.services.auth_service import AuthService
+
+    service = AuthService()
+    users = SQLAlchemyUserRepository(_sqlite_session())
+    return lambda: service.get_user_by_email(users, "bench@example.com")
+
+
+# Inline vs prebuilt: the same repository statements through the same session, so
+# the difference is the per-call construction and cache-key work that the prebuilt
+# statements in app.repositories.sql no longer pay.
+
+@case("TaskService.execute[inline]")
+def bench_task_execute_inline():
+    session = _sqlite_session()
+    build = _task_queries()
+
+    async def run():
+        count_stmt, list_stmt, get_stmt = build()
+        (await session.execute(count_stmt)).scalar()
+        (await session.execute(list_stmt)).scalars().all()
+        (await session.execute(get_stmt)).scalars().first()
+
+    return run
+
+
+@case("TaskService.execute[prebuilt]")
+def bench_task_execute_prebuilt():
+    from app.repositories.sql import COUNT_TASKS_STMT, GET_TASK_STMT, LIST_TASKS_STMT
+
+    session = _sqlite_session()
+
+    async def run():
+        (await session.execute(COUNT_TASKS_STMT, {"owner_id": 1})).scalar()
+        (await session.execute(LIST_TASKS_STMT, {"owner_id": 1, "offset": 20, "limit": 10})).scalars().all()
+        (await session.execute(GET_TASK_STMT, {"task_id": 5, "owner_id": 1})).scalars().first()
+
+    return run
+
+
+@case("AuthService.get_user_by_email[inline]")
+def bench_user_by_email_inline():
+    from app.repositories.sql import user_by_email_query
+
+    session = _sqlite_session()
+
+    async def run():
+        return (await session.execute(user_by_email_query("bench@example.com"))).scalars().first()
+
+    return run
+
+
+@case("AuthService.get_user_by_email[prebuilt]")
+def bench_user_by_email_prebuilt():
+    from app.repositories.sql import USER_BY_EMAIL_STMT
+
+    session = _sqlite_session()
+
+    async def run():
+        return (await session.execute(USER_BY_EMAIL_STMT, {"email": "bench@example.com"})).scalars().first()
+
+    return run
+
+
+# --- runner -------------------------------------------------------------------------
+
+def time_case(
+    fn: Callable, is_async: bool, min_time: float, repeats: int, loop: asyncio.AbstractEventLoop
+) -> float:
+    """Return the best time per call in microseconds."""
+    if is_async:
+        async def batch(n: int) -> None:
+            for _ in range(n):
+                await fn()
+
+        def run(n: int) -> float:
+            start = time.perf_counter()
+            loop.run_until_complete(batch(n))
+            return time.perf_counter() - start
+    else:
+        def run(n: int) -> float:
+            start = time.perf_counter()
+            for _ in range(n):
+                fn()
+            return time.perf_counter() - start
+
+    # Calibrate: grow the loop count until one batch takes at least min_time
+    number = 1
+    while True:
+        elapsed = run(number)
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    best = min(run(number) for _ in range(repeats))
+    return best / number * 1e6
+
+
+def run_cases(selected: List[str], min_time: float, repeats: int) -> Dict[str, float]:
+    loop = asyncio.new_event_loop()
+    # Cases set up their sessions on this loop
+    asyncio.set_event_loop(loop)
+    results = {}
+    try:
+        for name in selected:
+            fn = CASES[name]()
+            # Warm caches once; cases may return coroutines (handlers, ASGI apps)
+            first = fn()
+            is_async = inspect.iscoroutine(first)
+            if is_async:
+                loop.run_until_complete(first)
+            results[name] = round(time_case(fn, is_async, min_time, repeats, loop), 3)
+            print(f"{name:<36} {results[name]:>12.3f} us", flush=True)
+    finally:
+        for cleanup in CLEANUPS:
+            loop.run_until_complete(cleanup())
+        CLEANUPS.clear()
+        asyncio.set_event_loop(None)
+        loop.close()
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float) -> List[str]:
+    failures = []
+    print(f"\n{'case':<36} {'baseline us':>12} {'current us':>12} {'change':>9}")
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        change = regression_pct(current, baseline[name])
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{name:<36} {baseline[name]:>12.3f} {current:>12.3f} {change:>+8.1f}%{flag}")
+        if change > threshold:
+            failures.append(name)
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run hot-path micro-benchmarks")
+    parser.add_argument("-k", dest="pattern", help="Only run cases whose name contains this substring")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timed repeat")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT))
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="Fail when a case is this many percent slower than the baseline")
+    args = parser.parse_args()
+
+    selected = [name for name in CASES if not args.pattern or args.pattern in name]
+    results = run_cases(selected, args.min_time, args.repeats)
+
+    payload = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results_us": results,
+    }
+    RESULTS_DIR.mkdir(exist_ok=True)
+    save_json(args.output, payload)
+    if args.save_baseline:
+        save_json(args.baseline, payload)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    baseline = load_json(args.baseline) if Path(args.baseline).exists() else None
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    failures = compare(results, baseline["results_us"], args.threshold)
+    if failures:
+        print(f"\n{len(failures)} case(s) regressed by more than {args.threshold}%", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
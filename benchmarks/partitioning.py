@@ -0,0 +1,151 @@
+"""
+Compare TaskService-shaped queries on a plain vs a hash-partitioned tasks table.
+
+Builds both tables in a scratch schema with identical synthetic data and
+indexes, then times the list (count + page) and get-by-id queries for random
+owners against each. Needs only a Postgres reachable through the app settings:
+
+    python -m benchmarks.partitioning --owners 500 --tasks-per-owner 2000
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from benchmarks.stats import save_json, summarize
+
+SCHEMA = "bench_partitioning"
+
+INDEXES = [
+    "(owner_id, created_at DESC) WHERE NOT is_deleted",
+    "(id)",
+]
+
+QUERIES = {
+    "list_count": (
+        "SELECT count(*) FROM {table} WHERE owner_id = :owner_id AND NOT is_deleted"
+    ),
+    "list_page": (
+        "SELECT * FROM {table} WHERE owner_id = :owner_id AND NOT is_deleted "
+        "ORDER BY created_at DESC OFFSET :offset LIMIT 10"
+    ),
+    "get": (
+        "SELECT * FROM {table} WHERE id = :task_id AND owner_id = :owner_id AND NOT is_deleted"
+    ),
+}
+
+
+def setup_sql(owners: int, tasks_per_owner: int, partitions: int) -> List[str]:
+    statements = [
+        f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE",
+        f"CREATE SCHEMA {SCHEMA}",
+    ]
+    columns = """
+        id INTEGER NOT NULL,
+        title VARCHAR NOT NULL,
+        description TEXT,
+        status VARCHAR,
+        owner_id INTEGER NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        updated_at TIMESTAMP WITH TIME ZONE NOT NULL,
+        is_deleted BOOLEAN NOT NULL,
+        deleted_at TIMESTAMP WITH TIME ZONE
+    """
+    statements.append(f"CREATE TABLE {SCHEMA}.tasks_plain ({columns}, PRIMARY KEY (id))")
+    statements.append(
+        f"CREATE TABLE {SCHEMA}.tasks_hash ({columns}, PRIMARY KEY (id, owner_id)) "
+        f"PARTITION BY HASH (owner_id)"
+    )
+    for remainder in range(partitions):
+        statements.append(
+            f"CREATE TABLE {SCHEMA}.tasks_hash_p{remainder} PARTITION OF {SCHEMA}.tasks_hash "
+            f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        )
+
+    total = owners * tasks_per_owner
+    for table in ("tasks_plain", "tasks_hash"):
+        statements.append(f"""
+            INSERT INTO {SCHEMA}.{table}
+            SELECT g, 'task ' || g, repeat('x', (g % 400)),
+                   (ARRAY['pending', 'in_progress', 'done'])[g % 3 + 1],
+                   g % {owners} + 1,
+                   now() - (g || ' seconds')::interval, now(),
+                   g % 10 = 0, CASE WHEN g % 10 = 0 THEN now() END
+            FROM generate_series(1, {total}) g
+        """)
+        for definition in INDEXES:
+            statements.append(f"CREATE INDEX ON {SCHEMA}.{table} {definition}")
+        statements.append(f"ANALYZE {SCHEMA}.{table}")
+    return statements
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Dict[str, Dict[str, float]]]:
+    engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI)
+    rng = random.Random(args.seed)
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+    async with engine.connect() as conn:
+        if not args.skip_setup:
+            print(f"Loading {args.owners * args.tasks_per_owner} rows into each table...", flush=True)
+            for statement in setup_sql(args.owners, args.tasks_per_owner, args.partitions):
+                await conn.execute(text(statement))
+            await conn.commit()
+
+        max_offset = max(0, int(args.tasks_per_owner * 0.9) - 10)
+        for table in ("tasks_plain", "tasks_hash"):
+            results[table] = {}
+            for name, template in QUERIES.items():
+                stmt = text(template.format(table=f"{SCHEMA}.{table}"))
+                samples = []
+                for _ in range(args.iterations):
+                    owner_id = rng.randint(1, args.owners)
+                    params = {
+                        "owner_id": owner_id,
+                        "offset": rng.randint(0, max_offset),
+                        # ids are assigned round-robin across owners
+                        "task_id": owner_id - 1 + args.owners * rng.randint(1, args.tasks_per_owner - 1),
+                    }
+                    start = time.perf_counter()
+                    await conn.execute(stmt, params)
+                    samples.append((time.perf_counter() - start) * 1000)
+                results[table][name] = summarize(samples)
+
+        if not args.keep:
+            await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+            await conn.commit()
+
+    await engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark a plain vs hash-partitioned tasks table")
+    parser.add_argument("--owners", type=int, default=200)
+    parser.add_argument("--tasks-per-owner", type=int, default=500)
+    parser.add_argument("--partitions", type=int, default=settings.TASKS_PARTITION_COUNT)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-setup", action="store_true", help="Reuse tables from a previous --keep run")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema afterwards")
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    print(f"{'query':<12} {'table':<12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name in QUERIES:
+        for table, queries in results.items():
+            row = queries[name]
+            print(f"{name:<12} {table:<12} {row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8}")
+
+    if args.output:
+        save_json(args.output, {"params": vars(args), "results": results})
+
+
+if __name__ == "__main__":
+    main()
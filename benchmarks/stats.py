@@ -0,0 +1,39 @@
+import json
+import statistics
+from typing import Dict, List, Optional
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    if not samples_ms:
+        return {"count": 0}
+    return {
+        "count": len(samples_ms),
+        "p50_ms": round(statistics.median(samples_ms), 3),
+        "p95_ms": round(percentile(samples_ms, 0.95), 3),
+        "p99_ms": round(percentile(samples_ms, 0.99), 3),
+        "mean_ms": round(statistics.fmean(samples_ms), 3),
+    }
+
+
+def load_json(path: Optional[str]) -> Optional[dict]:
+    if not path:
+        return None
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def save_json(path: str, payload: dict) -> None:
+    with open(path, "w") as fh:
+        json.dump(payload, fh, indent=2, sort_keys=True)
+
+
+def regression_pct(current: float, baseline: float) -> float:
+    """How much worse `current` is than `baseline`, in percent (negative = faster)."""
+    if baseline <= 0:
+        return 0.0
+    return (current - baseline) / baseline * 100
@@ -1,12 +1,8 @@
 #!/bin/bash
 set -e
 
-echo "Waiting for database connection..."
-# A simple wait loop could be added here if needed, or rely on restart_policy.
-# But Alembic usually fails fast if DB is down.
-
-echo "Running migrations..."
-alembic upgrade head
-
+# Runs migrations once (under an advisory lock, skipped when already at head)
+# and starts WEB_CONCURRENCY uvicorn workers (default: one per CPU core).
+# exec so the server receives SIGTERM / SIGHUP from the container runtime.
 echo "Starting application..."
-uvicorn app.main:app --host 0.0.0.0 --port 8000
\ No newline at end of file
+exec python -m app.server "$@"
@@ -0,0 +1,72 @@
+import os
+
+# The suite runs without Postgres: storage is process-local and nothing is
+# started in the background. Set before the app's settings are imported.
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("BACKGROUND_JOBS_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import pytest
+
+import app.db.base  # noqa: F401  (registers every model, as the app does)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def client():
+    """A TestClient on a fresh app (fresh rate limit buckets) with empty memory storage."""
+    from fastapi.testclient import TestClient
+
+    from app.main import create_app
+    from app.repositories.memory import store
+
+    store.clear()
+    with TestClient(create_app()) as test_client:
+        yield test_client
+    store.clear()
+
+
+@pytest.fixture
+async def pg_user(anyio_backend):
+    """
+    A throwaway user in a migrated Postgres database, and a session factory.
+
+    Skips when Postgres is not reachable. Rows owned by the user are removed
+    afterwards.
+    """
+    from sqlalchemy import text
+
+    from app.db import session as db
+
+    engine = db.init_engine()
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1 FROM users LIMIT 1"))
+    except Exception as exc:
+        await db.dispose_engine()
+        pytest.skip(f"Postgres is not available: {exc!r}")
+
+    async with db.AsyncSessionLocal() as session:
+        user_id = (await session.execute(text(
+            "INSERT INTO users (email, hashed_password, is_active, is_deleted) "
+            "VALUES ('test-' || gen_random_uuid() || '@example.com', 'x', true, false) RETURNING id"
+        ))).scalar()
+        await session.commit()
+
+    yield user_id, db.AsyncSessionLocal
+
+    async with db.AsyncSessionLocal() as session:
+        for statement in (
+            "DELETE FROM outbox_jobs WHERE (payload ->> 'owner_id')::int = :user_id",
+            "DELETE FROM idempotency_keys WHERE user_id = :user_id",
+            "DELETE FROM tasks WHERE owner_id = :user_id",
+            "DELETE FROM tasks_archive WHERE owner_id = :user_id",
+            "DELETE FROM users WHERE id = :user_id",
+        ):
+            await session.execute(text(statement), {"user_id": user_id})
+        await session.commit()
+    await db.dispose_engine()
@@ -0,0 +1,73 @@
+import pytest
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db import session
+from app.repositories.memory import store
+
+TASKS = f"{settings.API_V1_STR}/tasks/"
+
+
+@pytest.fixture
+def auth():
+    return {"Authorization": f"Bearer {create_access_token(settings.FIRST_SUPERUSER)}"}
+
+
+def test_memory_mode_creates_no_engine(client):
+    ready = client.get("/health/ready")
+
+    assert ready.status_code == 200
+    assert ready.json()["data"]["database"] == "not_used"
+    assert session.engine is None
+
+
+def test_login_with_seeded_user(client):
+    response = client.post(f"{settings.API_V1_STR}/auth/login", json={
+        "username": settings.FIRST_SUPERUSER, "password": settings.FIRST_SUPERUSER_PASSWORD,
+    })
+
+    assert response.status_code == 200
+    assert response.json()["data"]["token_type"] == "bearer"
+
+
+def test_task_crud_and_pagination(client, auth):
+    created = [
+        client.post(TASKS, json={"title": f"task {i}"}, headers=auth).json()["data"]["id"]
+        for i in range(3)
+    ]
+
+    page = client.get(TASKS, params={"page": 1, "size": 2}, headers=auth).json()["data"]
+    assert page["pagination"] == {"page": 1, "size": 2, "total": 3, "pages": 2}
+    assert len(page["items"]) == 2
+
+    updated = client.put(f"{TASKS}{created[0]}", json={"status": "done"}, headers=auth)
+    assert updated.status_code == 200 and updated.json()["data"]["status"] == "done"
+
+    assert client.delete(f"{TASKS}{created[0]}", headers=auth).status_code == 204
+    assert client.get(f"{TASKS}{created[0]}", headers=auth).status_code == 404
+    assert client.get(TASKS, headers=auth).json()["data"]["pagination"]["total"] == 2
+
+
+def test_idempotency_key_in_memory_mode(client, auth):
+    headers = {**auth, "Idempotency-Key": "create-1"}
+
+    first = client.post(TASKS, json={"title": "once"}, headers=headers)
+    retry = client.post(TASKS, json={"title": "once"}, headers=headers)
+    reused = client.post(TASKS, json={"title": "different"}, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert reused.status_code == 422
+    assert len([task for task in store.tasks.values() if task.title == "once"]) == 1
+
+    delete_headers = {**auth, "Idempotency-Key": "delete-1"}
+    task_id = first.json()["data"]["id"]
+    assert client.delete(f"{TASKS}{task_id}", headers=delete_headers).status_code == 204
+    replayed = client.delete(f"{TASKS}{task_id}", headers=delete_headers)
+    assert replayed.status_code == 204 and replayed.headers["Idempotent-Replayed"] == "true"
+
+
+def test_requests_without_token_are_rejected(client):
+    assert client.get(TASKS).status_code in (401, 403)
+    assert client.get(TASKS, headers={"Authorization": "Bearer nonsense"}).status_code == 401
@@ -0,0 +1,40 @@
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.models.task import Task
+from app.models.task_archive import TaskArchive
+from app.services.archive_service import TaskArchiveService
+
+pytestmark = pytest.mark.anyio
+
+LONG_AGO = datetime(2000, 1, 1, tzinfo=timezone.utc)
+CUTOFF = datetime(2000, 1, 2, tzinfo=timezone.utc)
+
+
+async def test_archive_moves_only_old_soft_deleted_tasks(pg_user):
+    user_id, sessions = pg_user
+    async with sessions() as db:
+        tasks = [
+            Task(title="old deleted", owner_id=user_id, is_deleted=True, deleted_at=LONG_AGO),
+            Task(title="old deleted 2", owner_id=user_id, is_deleted=True, deleted_at=LONG_AGO),
+            Task(title="recently deleted", owner_id=user_id, is_deleted=True, deleted_at=datetime.now(timezone.utc)),
+            Task(title="live", owner_id=user_id),
+        ]
+        db.add_all(tasks)
+        await db.commit()
+        ids = [task.id for task in tasks]
+
+        moved = await TaskArchiveService().archive_batch(db, CUTOFF, min(ids) - 1, batch_size=1)
+        moved += await TaskArchiveService().archive_batch(db, CUTOFF, max(moved), batch_size=10)
+
+    assert sorted(moved) == ids[:2]
+    async with sessions() as db:
+        remaining = (await db.execute(select(Task.id).where(Task.owner_id == user_id))).scalars().all()
+        archived = (await db.execute(
+            select(TaskArchive.id, TaskArchive.title).where(TaskArchive.owner_id == user_id)
+        )).all()
+
+    assert sorted(remaining) == ids[2:]
+    assert sorted(archived) == [(ids[0], "old deleted"), (ids[1], "old deleted 2")]
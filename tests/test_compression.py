@@ -0,0 +1,92 @@
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.core import compression
+from app.core.compression import CompressionMiddleware, negotiate_encoding
+
+BIG = {"items": ["x" * 100] * 50}
+
+
+@pytest.fixture
+def client():
+    async def big(request):
+        return JSONResponse(BIG)
+
+    async def small(request):
+        return JSONResponse({"ok": True})
+
+    async def image(request):
+        return Response(b"\x89PNG" * 1000, media_type="image/png")
+
+    async def stream(request):
+        async def chunks():
+            for i in range(20):
+                yield (f'{{"row": {i}, "pad": "{"y" * 200}"}}\n').encode()
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    app = Starlette(routes=[
+        Route("/big", big, methods=["GET", "HEAD"]),
+        Route("/small", small),
+        Route("/image", image),
+        Route("/stream", stream),
+    ])
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, offload_size=2048)
+    return TestClient(app)
+
+
+def raw_get(client, path: str, accept: str):
+    """GET without httpx decoding the body, so the compressed bytes can be checked."""
+    with client.stream("GET", path, headers={"Accept-Encoding": accept}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_negotiation_follows_q_values(monkeypatch):
+    monkeypatch.setattr(compression, "ENCODERS", {"zstd": None, "br": None, "gzip": None})
+
+    assert negotiate_encoding("gzip, br, zstd") == "zstd"
+    assert negotiate_encoding("gzip;q=1.0, br;q=0.5") == "gzip"
+    assert negotiate_encoding("br;q=0.8, gzip;q=0.9, zstd;q=0") == "gzip"
+    assert negotiate_encoding("*;q=0.1, gzip;q=0") == "zstd"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip;q=oops") is None
+    assert negotiate_encoding("") is None
+
+
+def test_large_json_is_gzipped_with_its_length(client):
+    response, body = raw_get(client, "/big", "gzip")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(body)
+    assert gzip.decompress(body) == JSONResponse(BIG).body
+
+
+def test_small_and_binary_bodies_are_left_alone(client):
+    small, small_body = raw_get(client, "/small", "gzip")
+    image, image_body = raw_get(client, "/image", "gzip")
+    plain, _ = raw_get(client, "/big", "identity")
+
+    assert "content-encoding" not in small.headers and small_body == b'{"ok":true}'
+    assert "content-encoding" not in image.headers and image_body.startswith(b"\x89PNG")
+    assert "content-encoding" not in plain.headers
+
+
+def test_streaming_body_is_compressed_incrementally(client):
+    response, body = raw_get(client, "/stream", "gzip")
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = gzip.decompress(body).decode().splitlines()
+    assert len(lines) == 20 and lines[-1].startswith('{"row": 19')
+
+
+def test_head_is_passed_through(client):
+    response = client.head("/big", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import func, select, text
+
+from app.models.idempotency_key import IdempotencyKey
+from app.models.outbox import OutboxJob
+from app.models.task import Task
+from app.models.task_archive import TaskArchive
+from app.models.user import User
+from benchmarks.datagen import reset
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_reset_removes_every_row_of_generated_users(pg_user):
+    user_id, sessions = pg_user
+    async with sessions() as db:
+        # Runs in one transaction that is rolled back, so data generated by
+        # earlier load tests survives the test
+        generated_id = (await db.execute(text(
+            "INSERT INTO users (email, hashed_password, is_active, is_deleted) "
+            "VALUES ('loadtest-' || gen_random_uuid() || '@example.com', 'x', true, false) RETURNING id"
+        ))).scalar()
+        for owner_id in (generated_id, user_id):
+            task = Task(title="task", owner_id=owner_id)
+            db.add(task)
+            await db.flush()
+            db.add_all([
+                TaskArchive(id=task.id + 1_000_000_000, title="archived", owner_id=owner_id),
+                OutboxJob(topic="task.created", payload={"task_id": task.id, "owner_id": owner_id}),
+                IdempotencyKey(
+                    user_id=owner_id, key="k", request_hash="h", expires_at=func.now(),
+                ),
+            ])
+        await db.flush()
+
+        await reset(await db.connection())
+
+        counts = {}
+        for model, owner in (
+            (Task, Task.owner_id),
+            (TaskArchive, TaskArchive.owner_id),
+            (OutboxJob, OutboxJob.payload["owner_id"].as_integer()),
+            (IdempotencyKey, IdempotencyKey.user_id),
+        ):
+            rows = await db.execute(
+                select(owner, func.count()).select_from(model)
+                .where(owner.in_([generated_id, user_id])).group_by(owner)
+            )
+            counts[model.__tablename__] = dict(rows.all())
+        users = (await db.execute(select(User.id).where(User.id.in_([generated_id, user_id])))).scalars().all()
+        await db.rollback()
+
+    assert counts == {
+        "tasks": {user_id: 1},
+        "tasks_archive": {user_id: 1},
+        "outbox_jobs": {user_id: 1},
+        "idempotency_keys": {user_id: 1},
+    }
+    assert users == [user_id]
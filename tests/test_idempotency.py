@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select, text, update
+
+from app.models.idempotency_key import IdempotencyKey, IdempotencyStatus
+from app.models.task import Task
+from app.repositories.sql import SQLAlchemyTaskRepository
+from app.services.idempotency_service import (
+    IdempotencyKeyLostError,
+    IdempotencyKeyReusedError,
+    IdempotencyService,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+async def count_tasks(sessions, user_id: int) -> int:
+    async with sessions() as db:
+        return (await db.execute(select(func.count()).select_from(Task).where(Task.owner_id == user_id))).scalar()
+
+
+async def key_status(sessions, user_id: int, key: str):
+    async with sessions() as db:
+        return (await db.execute(
+            select(IdempotencyKey.status).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        )).scalar()
+
+
+def create_operation(db, user_id: int, calls: list):
+    async def operation():
+        calls.append(1)
+        task = await SQLAlchemyTaskRepository(db).create(user_id, {"title": "idempotent"})
+        return 201, {"id": task.id}
+    return operation
+
+
+async def test_retry_replays_the_stored_response(pg_user):
+    user_id, sessions = pg_user
+    service, calls = IdempotencyService(), []
+
+    async with sessions() as db:
+        first, replayed = await service.execute(db, user_id, "k1", "hash", create_operation(db, user_id, calls))
+        assert not replayed
+    async with sessions() as db:
+        second, replayed = await service.execute(db, user_id, "k1", "hash", create_operation(db, user_id, calls))
+        assert replayed
+
+    assert first == second
+    assert len(calls) == 1
+    assert await count_tasks(sessions, user_id) == 1
+    assert await key_status(sessions, user_id, "k1") == IdempotencyStatus.COMPLETED.value
+
+
+async def test_key_reused_with_another_request_is_rejected(pg_user):
+    user_id, sessions = pg_user
+    service = IdempotencyService()
+
+    async with sessions() as db:
+        await service.execute(db, user_id, "k1", "hash-a", create_operation(db, user_id, []))
+    async with sessions() as db:
+        with pytest.raises(IdempotencyKeyReusedError):
+            await service.execute(db, user_id, "k1", "hash-b", create_operation(db, user_id, []))
+
+
+async def test_failed_operation_releases_the_key_and_rolls_back_the_write(pg_user):
+    user_id, sessions = pg_user
+    service = IdempotencyService()
+
+    async def failing():
+        await create_operation(db, user_id, [])()
+        raise ValueError("boom")
+
+    async with sessions() as db:
+        with pytest.raises(ValueError):
+            await service.execute(db, user_id, "k1", "hash", failing)
+
+    assert await count_tasks(sessions, user_id) == 0
+    assert await key_status(sessions, user_id, "k1") is None
+
+
+async def test_cancelled_write_is_not_committed_and_key_is_left_to_expire(pg_user):
+    user_id, sessions = pg_user
+    service = IdempotencyService()
+
+    async def crashing():
+        await create_operation(db, user_id, [])()
+        raise asyncio.CancelledError()
+
+    async with sessions() as db:
+        with pytest.raises(asyncio.CancelledError):
+            await service.execute(db, user_id, "k1", "hash", crashing)
+
+    # Neither the task nor a completed response: a retry after the lock
+    # timeout creates the task exactly once
+    assert await count_tasks(sessions, user_id) == 0
+    assert await key_status(sessions, user_id, "k1") == IdempotencyStatus.IN_PROGRESS.value
+
+
+async def test_write_is_rolled_back_when_the_key_was_taken_over(pg_user):
+    user_id, sessions = pg_user
+    service = IdempotencyService()
+
+    async def slow_operation():
+        response = await create_operation(db, user_id, [])()
+        # A retry took the key over after IDEMPOTENCY_LOCK_TIMEOUT_SECONDS
+        async with sessions() as other:
+            await other.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == "k1")
+                .values(updated_at=text("now() + interval '1 second'"))
+            )
+            await other.commit()
+        return response
+
+    async with sessions() as db:
+        with pytest.raises(IdempotencyKeyLostError):
+            await service.execute(db, user_id, "k1", "hash", slow_operation)
+
+    assert await count_tasks(sessions, user_id) == 0
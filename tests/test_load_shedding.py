@@ -0,0 +1,101 @@
+from app.core.load_shedding import AdaptiveConcurrencyLimiter, Priority, concurrency_limiter
+
+
+def make_limiter(**kwargs) -> AdaptiveConcurrencyLimiter:
+    options = dict(initial_limit=20, min_limit=4, max_limit=200, target_latency=0.25, backoff_ratio=0.5)
+    options.update(kwargs)
+    return AdaptiveConcurrencyLimiter(**options)
+
+
+def test_concurrent_slow_requests_decrease_the_limit_once():
+    limiter = make_limiter()
+    for _ in range(10):
+        assert limiter.try_acquire()
+
+    # All ten started at t=100 and finished slow around t=101
+    for i in range(10):
+        limiter.release(1.0 + i * 0.01, now=101.0 + i * 0.01)
+
+    assert limiter.limit == 10
+
+
+def test_slow_request_started_after_a_decrease_decreases_again():
+    limiter = make_limiter()
+    limiter.try_acquire()
+    limiter.release(1.0, now=101.0)
+    limiter.try_acquire()
+    limiter.release(1.0, now=102.5)
+
+    assert limiter.limit == 5
+
+
+def test_decrease_stops_at_min_limit():
+    limiter = make_limiter()
+    for second in range(10):
+        limiter.try_acquire()
+        limiter.release(0.5, failed=True, now=float(second))
+
+    assert limiter.limit == 4
+
+
+def test_fast_requests_grow_the_limit_only_when_saturated():
+    limiter = make_limiter(initial_limit=4)
+    limiter.try_acquire()
+    limiter.release(0.01, now=1.0)
+    assert limiter.limit == 4
+
+    for _ in range(50):
+        for _ in range(3):
+            limiter.try_acquire()
+        for _ in range(3):
+            limiter.release(0.01, now=1.0)
+
+    assert limiter.limit > 4
+
+
+def test_unsampled_latency_does_not_shrink_the_limit_but_failures_do():
+    limiter = make_limiter()
+    limiter.try_acquire()
+    limiter.release(2.0, sample=False, now=10.0)
+    assert limiter.limit == 20
+    assert limiter.latency_ewma is None
+
+    limiter.try_acquire()
+    limiter.release(0.1, failed=True, sample=False, now=20.0)
+    assert limiter.limit == 10
+
+
+def test_low_priority_only_uses_a_share_of_the_limit():
+    limiter = make_limiter(initial_limit=10)
+    accepted = sum(limiter.try_acquire(Priority.LOW) for _ in range(10))
+
+    assert accepted == 7
+    assert limiter.try_acquire(Priority.HIGH)
+    assert limiter.rejected == 3
+
+
+def test_saturated_pod_sheds_but_stays_ready(client, monkeypatch):
+    monkeypatch.setattr(concurrency_limiter, "in_flight", concurrency_limiter.limit)
+
+    shed = client.get("/")
+    ready = client.get("/health/ready")
+
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"]
+    assert shed.json()["status"] == 503
+    assert ready.status_code == 200
+    assert ready.json()["data"]["limiter"]["in_flight"] == concurrency_limiter.limit
+
+
+def test_login_latency_is_not_sampled(client, monkeypatch):
+    released = []
+    original = concurrency_limiter.release
+    monkeypatch.setattr(
+        concurrency_limiter, "release",
+        lambda latency, **kwargs: released.append(kwargs["sample"]) or original(latency, **kwargs),
+    )
+
+    client.post("/api/v1/auth/login", json={"username": "nobody@example.com", "password": "x"})
+    client.get("/")
+
+    assert released == [False, True]
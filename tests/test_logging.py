@@ -0,0 +1,101 @@
+import json
+import logging
+import queue
+import subprocess
+import sys
+from pathlib import Path
+
+from app.core import logging_config
+from app.core.logging_config import (
+    JSONFormatter,
+    NonBlockingQueueHandler,
+    RepeatedExceptionFilter,
+    request_id_var,
+)
+
+
+def make_record(msg: str = "hello", exc_info=None, **extra) -> logging.LogRecord:
+    record = logging.LogRecord("app.test", logging.ERROR, __file__, 1, msg, (), exc_info)
+    record.__dict__.update(extra)
+    return record
+
+
+def raise_error():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        return sys.exc_info()
+
+
+def test_json_formatter_includes_extras_and_traceback():
+    line = JSONFormatter().format(make_record(exc_info=raise_error(), request_id="r1", task_id=7))
+    payload = json.loads(line)
+
+    assert payload["message"] == "hello"
+    assert payload["level"] == "ERROR"
+    assert payload["request_id"] == "r1"
+    assert payload["task_id"] == 7
+    assert payload["exc_type"] == "ValueError"
+    assert "boom" in payload["exc_info"]
+
+
+def test_queue_handler_tags_request_id_and_drops_when_full():
+    log_queue = queue.Queue(maxsize=1)
+    handler = NonBlockingQueueHandler(log_queue)
+    token = request_id_var.set("req-42")
+    try:
+        handler.handle(make_record("first"))
+        handler.handle(make_record("dropped"))
+        handler.handle(make_record("dropped too"))
+    finally:
+        request_id_var.reset(token)
+
+    first = log_queue.get_nowait()
+    assert first.request_id == "req-42"
+    assert handler.dropped == 2
+
+    # The next record that gets through reports how many were lost
+    handler.handle(make_record("after"))
+    after = log_queue.get_nowait()
+    assert after.dropped_records == 2
+    assert handler.dropped == 0
+
+
+def test_repeated_exceptions_are_suppressed_per_window(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(logging_config.time, "monotonic", lambda: now[0])
+    log_filter = RepeatedExceptionFilter(burst=2, window=60)
+    exc_info = raise_error()
+
+    passed = [log_filter.filter(make_record(exc_info=exc_info)) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    # Records without an exception are never filtered
+    assert log_filter.filter(make_record())
+
+    now[0] += 60
+    record = make_record(exc_info=exc_info)
+    assert log_filter.filter(record)
+    assert record.suppressed == 3
+
+
+def test_create_app_starts_no_listener():
+    # A fresh interpreter, so no other test's app has set up logging
+    probe = (
+        "import app.main; from app.core import logging_config; "
+        "app.main.create_app(); print(logging_config._listener is None)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=Path(__file__).parents[1], capture_output=True, text=True, check=True,
+    )
+
+    assert result.stdout.strip() == "True"
+
+
+def test_lifespan_runs_the_listener_while_serving():
+    from fastapi.testclient import TestClient
+
+    from app.main import create_app
+
+    with TestClient(create_app()):
+        assert logging_config._listener is not None
+    assert logging_config._listener is None
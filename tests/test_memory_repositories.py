@@ -0,0 +1,129 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.repositories.memory import (
+    InMemoryIdempotencyRepository,
+    InMemoryTaskRepository,
+    InMemoryUserRepository,
+    MemoryStore,
+)
+from app.services.idempotency_service import IdempotencyKeyInProgressError, IdempotencyKeyReusedError
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def memory():
+    return MemoryStore()
+
+
+async def test_tasks_are_listed_newest_first_per_owner(memory):
+    repo = InMemoryTaskRepository(memory)
+    ids = [memory.add_task(1, created_at=START + timedelta(minutes=i), title=f"t{i}").id for i in range(5)]
+    memory.add_task(2, created_at=START, title="other owner")
+
+    assert await repo.count(1) == 5
+    assert [task.id for task in await repo.list(1, 0, 2)] == [ids[4], ids[3]]
+    assert [task.id for task in await repo.list(1, 4, 2)] == [ids[0]]
+    assert await repo.list(1, 10, 2) == []
+    assert await repo.get(ids[0], 2) is None
+
+
+async def test_soft_deleted_tasks_leave_every_read(memory):
+    repo = InMemoryTaskRepository(memory)
+    task = await repo.create(1, {"title": "doomed"})
+    kept = await repo.create(1, {"title": "kept", "description": "d"})
+
+    await repo.soft_delete(task)
+
+    assert task.is_deleted and task.deleted_at is not None
+    assert await repo.get(task.id, 1) is None
+    assert await repo.count(1) == 1
+    assert [t.id for t in await repo.list(1, 0, 10)] == [kept.id]
+
+
+async def test_update_sets_fields_and_timestamp(memory):
+    repo = InMemoryTaskRepository(memory)
+    task = await repo.create(1, {"title": "old"})
+    before = task.updated_at
+
+    updated = await repo.update(task, {"title": "new", "status": "done"})
+
+    assert (updated.title, updated.status) == ("new", "done")
+    assert updated.updated_at >= before
+    assert (await repo.get(task.id, 1)).title == "new"
+
+
+async def test_users_are_found_by_email(memory):
+    user = memory.add_user("a@example.com", "hash")
+    repo = InMemoryUserRepository(memory)
+
+    assert await repo.get_by_email("a@example.com") is user
+    assert await repo.get_by_email("b@example.com") is None
+
+
+async def test_idempotency_replays_and_rejects_reuse(memory):
+    repo, calls = InMemoryIdempotencyRepository(memory), []
+
+    async def operation():
+        calls.append(1)
+        return 201, {"id": len(calls)}
+
+    first = await repo.execute(1, "k", "hash", operation)
+    retry = await repo.execute(1, "k", "hash", operation)
+    other_user = await repo.execute(2, "k", "hash", operation)
+
+    assert first == ((201, {"id": 1}), False)
+    assert retry == ((201, {"id": 1}), True)
+    assert other_user == ((201, {"id": 2}), False)
+    with pytest.raises(IdempotencyKeyReusedError):
+        await repo.execute(1, "k", "other hash", operation)
+
+
+async def test_idempotency_duplicate_waits_for_the_first_request(memory, monkeypatch):
+    repo, calls = InMemoryIdempotencyRepository(memory), []
+    release = asyncio.Event()
+
+    async def operation():
+        calls.append(1)
+        await release.wait()
+        return 200, None
+
+    first = asyncio.create_task(repo.execute(1, "k", "hash", operation))
+    await asyncio.sleep(0)
+    duplicate = asyncio.create_task(repo.execute(1, "k", "hash", operation))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await first == ((200, None), False)
+    assert await duplicate == ((200, None), True)
+    assert len(calls) == 1
+
+    monkeypatch.setattr(settings, "IDEMPOTENCY_WAIT_TIMEOUT_SECONDS", 0.01)
+    release.clear()
+    slow = asyncio.create_task(repo.execute(1, "slow", "hash", operation))
+    await asyncio.sleep(0)
+    with pytest.raises(IdempotencyKeyInProgressError):
+        await repo.execute(1, "slow", "hash", operation)
+    release.set()
+    await slow
+
+
+async def test_idempotency_key_is_released_when_the_operation_fails(memory):
+    repo = InMemoryIdempotencyRepository(memory)
+
+    async def failing():
+        raise RuntimeError("boom")
+
+    async def working():
+        return 201, {"ok": True}
+
+    with pytest.raises(RuntimeError):
+        await repo.execute(1, "k", "hash", failing)
+
+    assert await repo.execute(1, "k", "hash", working) == ((201, {"ok": True}), False)
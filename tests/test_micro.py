@@ -0,0 +1,10 @@
+import pytest
+
+from benchmarks import micro
+
+
+def test_every_case_runs():
+    pytest.importorskip("aiosqlite")
+    results = micro.run_cases(list(micro.CASES), min_time=0.001, repeats=1)
+    assert set(results) == set(micro.CASES)
+    assert all(value > 0 for value in results.values())
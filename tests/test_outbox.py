@@ -0,0 +1,154 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.jobs.outbox_worker import OutboxWorker, retry_delay
+from app.models.outbox import OutboxJob, OutboxStatus
+from app.services.outbox_service import OutboxService
+
+pytestmark = pytest.mark.anyio
+
+# Jobs of the tests are due long before anything else in the queue, so a
+# claim limited to their number only picks them up
+LONG_AGO = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+async def add_jobs(sessions, user_id: int, topic: str, count: int = 1) -> list:
+    async with sessions() as db:
+        jobs = [
+            OutboxJob(topic=topic, payload={"owner_id": user_id, "n": i}, status="pending",
+                      attempts=0, available_at=LONG_AGO)
+            for i in range(count)
+        ]
+        db.add_all(jobs)
+        await db.commit()
+        return [job.id for job in jobs]
+
+
+async def make_due(sessions, job_ids: list) -> None:
+    async with sessions() as db:
+        await db.execute(update(OutboxJob).where(OutboxJob.id.in_(job_ids)).values(available_at=LONG_AGO))
+        await db.commit()
+
+
+async def load(sessions, job_ids: list) -> dict:
+    async with sessions() as db:
+        rows = await db.execute(select(OutboxJob).where(OutboxJob.id.in_(job_ids)))
+        return {job.id: job for job in rows.scalars()}
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    def set_limits(concurrency: int, batch_size: int, max_attempts: int = 8):
+        monkeypatch.setattr(settings, "OUTBOX_CONCURRENCY", concurrency)
+        monkeypatch.setattr(settings, "OUTBOX_BATCH_SIZE", batch_size)
+        monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", max_attempts)
+    return set_limits
+
+
+def test_retry_delay_grows_and_is_capped(monkeypatch):
+    monkeypatch.setattr(settings, "OUTBOX_RETRY_BASE_SECONDS", 1.0)
+    monkeypatch.setattr(settings, "OUTBOX_RETRY_MAX_SECONDS", 10.0)
+
+    assert 0.5 <= retry_delay(1) <= 1.0
+    assert 2.0 <= retry_delay(3) <= 4.0
+    assert 5.0 <= retry_delay(20) <= 10.0
+
+
+async def test_claims_never_exceed_free_slots(limits):
+    limits(concurrency=3, batch_size=2)
+    worker = OutboxWorker(handlers={})
+
+    assert await worker.reserve_slots() == 2
+    assert await worker.reserve_slots() == 1
+    waiting = asyncio.create_task(worker.reserve_slots())
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    worker.release_slots(2)
+    assert await waiting == 2
+    assert worker.reserved == 3
+
+
+async def test_stale_claim_cannot_record_an_outcome(pg_user):
+    user_id, sessions = pg_user
+    service = OutboxService()
+    [job_id] = await add_jobs(sessions, user_id, "test.stale")
+
+    async with sessions() as db:
+        [stale] = await service.claim_batch(db, 1, lease_seconds=60)
+    # The lease expires and another worker claims the job again
+    await make_due(sessions, [job_id])
+    async with sessions() as db:
+        [current] = await service.claim_batch(db, 1, lease_seconds=60)
+    assert (stale.id, stale.attempts, current.attempts) == (job_id, 1, 2)
+
+    async with sessions() as db:
+        assert await service.complete(db, [stale]) == 0
+        assert not await service.retry(db, stale, 1.0, "late")
+        assert not await service.dead_letter(db, stale, "late")
+        await db.commit()
+    assert (await load(sessions, [job_id]))[job_id].last_error is None
+
+    async with sessions() as db:
+        assert await service.complete(db, [current]) == 1
+        await db.commit()
+    assert await load(sessions, [job_id]) == {}
+
+
+async def test_worker_completes_succeeded_jobs_within_its_slots(pg_user, limits):
+    user_id, sessions = pg_user
+    limits(concurrency=2, batch_size=5)
+    seen = []
+
+    async def handler(payload):
+        seen.append(payload["n"])
+
+    worker = OutboxWorker(handlers={"test.ok": handler})
+    job_ids = await add_jobs(sessions, user_id, "test.ok", count=3)
+
+    assert await worker.run_batch() == 2
+    assert sorted(seen) == [0, 1]
+    assert list(await load(sessions, job_ids)) == [job_ids[2]]
+    assert worker.reserved == 0 and worker.in_flight == 0
+    assert worker.counters["succeeded"] == 2
+
+
+async def test_failing_job_is_retried_then_dead_lettered(pg_user, limits):
+    user_id, sessions = pg_user
+    limits(concurrency=1, batch_size=1, max_attempts=2)
+
+    async def failing(payload):
+        raise RuntimeError("downstream unavailable")
+
+    worker = OutboxWorker(handlers={"test.fail": failing})
+    [job_id] = await add_jobs(sessions, user_id, "test.fail")
+
+    assert await worker.run_batch() == 1
+    job = (await load(sessions, [job_id]))[job_id]
+    assert (job.status, job.attempts) == (OutboxStatus.PENDING.value, 1)
+    assert "downstream unavailable" in job.last_error
+    assert job.available_at > datetime.now(timezone.utc)
+
+    await make_due(sessions, [job_id])
+    assert await worker.run_batch() == 1
+    job = (await load(sessions, [job_id]))[job_id]
+    assert (job.status, job.attempts) == (OutboxStatus.DEAD.value, 2)
+    assert worker.counters == {
+        "claimed": 2, "succeeded": 0, "retried": 1, "dead_lettered": 1, "lease_lost": 0,
+    }
+
+
+async def test_job_without_handler_is_dead_lettered_at_once(pg_user, limits):
+    user_id, sessions = pg_user
+    limits(concurrency=1, batch_size=1)
+    worker = OutboxWorker(handlers={})
+    [job_id] = await add_jobs(sessions, user_id, "test.unknown")
+
+    assert await worker.run_batch() == 1
+    job = (await load(sessions, [job_id]))[job_id]
+    assert job.status == OutboxStatus.DEAD.value
+    assert "No handler registered" in job.last_error
@@ -0,0 +1,104 @@
+import uuid
+
+import pytest
+from sqlalchemy import event, pool, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import settings
+from app.db import partitioning
+from app.db import session as db
+from app.db.migrate import upgrade_to_head
+from app.jobs import partition_tasks
+from app.repositories.sql import SQLAlchemyTaskRepository
+
+pytestmark = pytest.mark.anyio
+
+
+def test_partitioned_table_is_hashed_on_the_owner_with_a_composite_key():
+    create_table, *partitions = partitioning.create_partitioned_table_sql(4)[:5]
+
+    assert "PARTITION BY HASH (owner_id)" in create_table
+    assert "PRIMARY KEY (id, owner_id)" in create_table
+    assert "owner_id INTEGER NOT NULL" in create_table
+    assert partitions[-1].endswith("FOR VALUES WITH (MODULUS 4, REMAINDER 3)")
+
+
+@pytest.fixture
+async def scratch_database(monkeypatch, anyio_backend):
+    """A freshly migrated database of its own: the swap replaces `tasks`."""
+    name = f"test_partitioning_{uuid.uuid4().hex[:8]}"
+    admin = create_async_engine(
+        settings.SQLALCHEMY_DATABASE_URI, poolclass=pool.NullPool, isolation_level="AUTOCOMMIT"
+    )
+    try:
+        async with admin.connect() as conn:
+            await conn.execute(text(f"CREATE DATABASE {name}"))
+    except Exception as exc:
+        await admin.dispose()
+        pytest.skip(f"Cannot create a scratch database: {exc!r}")
+
+    monkeypatch.setattr(settings, "POSTGRES_DB", name)
+    try:
+        await upgrade_to_head()
+        db.init_engine()
+        yield
+    finally:
+        await db.dispose_engine()
+        async with admin.connect() as conn:
+            await conn.execute(text(f"DROP DATABASE {name} WITH (FORCE)"))
+        await admin.dispose()
+
+
+async def execute(statement: str):
+    async with db.AsyncSessionLocal() as session:
+        result = await session.execute(text(statement))
+        await session.commit()
+        return result
+
+
+async def test_partition_job_steps_are_explicit_and_rerunnable(scratch_database):
+    owner_id = (await execute(
+        "INSERT INTO users (email, hashed_password, is_active, is_deleted) "
+        "VALUES ('owner@example.com', 'x', true, false) RETURNING id"
+    )).scalar()
+    await execute(f"INSERT INTO tasks (title, owner_id, is_deleted) VALUES ('a', {owner_id}, false)")
+    await execute("INSERT INTO tasks (title, owner_id, is_deleted) VALUES ('orphan', NULL, false)")
+
+    with pytest.raises(RuntimeError, match="no owner_id"):
+        await partition_tasks.prepare(4)
+
+    await execute("DELETE FROM tasks WHERE owner_id IS NULL")
+    await partition_tasks.prepare(4)
+    await partition_tasks.prepare(4)
+    with pytest.raises(RuntimeError, match="4 partitions"):
+        await partition_tasks.prepare(8)
+
+    # Written after prepare: mirrored by the trigger, then copied again harmlessly
+    await execute(f"INSERT INTO tasks (title, owner_id, is_deleted) VALUES ('b', {owner_id}, false)")
+    assert await partition_tasks.copy_tasks(batch_size=1, pause=0) == 2
+    assert await partition_tasks.swap_tables()
+
+    assert not await partition_tasks.swap_tables()
+    assert await partition_tasks.copy_tasks(batch_size=1, pause=0) == 0
+    await partition_tasks.prepare(4)
+    async with db.AsyncSessionLocal() as session:
+        state = await partition_tasks.get_state(session)
+    assert state.partitioned
+
+    # The app keeps working on the partitioned table, and ORM writes name the
+    # partition key so they prune to one partition
+    statements = []
+    event.listen(
+        db.engine.sync_engine, "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    async with db.AsyncSessionLocal() as session:
+        tasks = SQLAlchemyTaskRepository(session)
+        task = await tasks.create(owner_id, {"title": "c"})
+        await tasks.update(task, {"title": "d"})
+        await tasks.soft_delete(task)
+        assert await tasks.count(owner_id) == 2
+
+    updates = [statement for statement in statements if statement.startswith("UPDATE tasks")]
+    assert len(updates) == 2
+    assert all("tasks.owner_id =" in statement for statement in updates)
@@ -0,0 +1,65 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.config import settings
+from app.core.middleware import RequestIDMiddleware
+from app.core.profiling import PROFILE_HEADER, PROFILE_ID_HEADER, ProfilingMiddleware
+from app.core.security import create_access_token
+
+
+@pytest.fixture
+def profiled(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "PROFILING_SECRET", "s3cret-ü")
+    monkeypatch.setattr(settings, "PROFILING_ALLOWED_USERS", ["admin@example.com"])
+    monkeypatch.setattr(settings, "PROFILING_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "PROFILING_OUTPUT_DIR", str(tmp_path))
+
+    async def endpoint(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/", endpoint)])
+    app.add_middleware(ProfilingMiddleware)
+    # Added last, so it runs first and the profile is named after the request
+    app.add_middleware(RequestIDMiddleware)
+    return TestClient(app), tmp_path
+
+
+def test_request_without_header_is_not_profiled(profiled):
+    client, output_dir = profiled
+
+    response = client.get("/")
+
+    assert response.status_code == 200
+    assert PROFILE_ID_HEADER not in response.headers
+    assert not list(output_dir.iterdir())
+
+
+def test_secret_is_compared_as_bytes(profiled):
+    client, output_dir = profiled
+
+    # Non-ASCII values used to make compare_digest raise TypeError (a 500)
+    wrong = client.get("/", headers={PROFILE_HEADER: "wrong-é".encode("latin-1")})
+    right = client.get("/", headers={PROFILE_HEADER: "s3cret-ü".encode(), "X-Request-ID": "req-42"})
+
+    assert wrong.status_code == 200 and PROFILE_ID_HEADER not in wrong.headers
+    assert right.status_code == 200 and right.headers[PROFILE_ID_HEADER] == "req-42"
+    assert [path.name for path in output_dir.iterdir()] == ["req-42.speedscope.json"]
+
+
+def test_allowed_user_can_profile_without_secret(profiled, monkeypatch):
+    client, _ = profiled
+    monkeypatch.setattr(settings, "PROFILING_SECRET", None)
+    monkeypatch.setattr(settings, "PROFILING_FORMAT", "collapsed")
+
+    allowed = client.get("/", headers={
+        PROFILE_HEADER: "1", "Authorization": f"Bearer {create_access_token('admin@example.com')}",
+    })
+    other = client.get("/", headers={
+        PROFILE_HEADER: "1", "Authorization": f"Bearer {create_access_token('user@example.com')}",
+    })
+
+    assert PROFILE_ID_HEADER in allowed.headers
+    assert PROFILE_ID_HEADER not in other.headers
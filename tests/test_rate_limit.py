@@ -0,0 +1,110 @@
+import pytest
+from starlette.requests import Request
+
+from app.core import rate_limit, security
+from app.core.rate_limit import InMemoryRateLimitStore, RateLimitMiddleware, RateLimitRule
+
+pytestmark = pytest.mark.anyio
+
+
+def make_request(path: str, authorization: str = None, client: str = "10.0.0.1") -> Request:
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    return Request({
+        "type": "http", "method": "GET", "path": path, "headers": headers,
+        "client": (client, 1234), "query_string": b"",
+    })
+
+
+async def test_bucket_allows_burst_then_rejects():
+    store = InMemoryRateLimitStore()
+    rule = RateLimitRule("test", capacity=2, refill_rate=1.0)
+
+    assert (await store.consume("k", rule)).allowed
+    assert (await store.consume("k", rule)).remaining == 0
+    rejected = await store.consume("k", rule)
+
+    assert not rejected.allowed
+    assert 0 < rejected.retry_after <= 1.0
+
+
+async def test_rejected_request_spends_no_tokens_from_other_buckets():
+    store = InMemoryRateLimitStore()
+    user_rule = RateLimitRule("user", capacity=5, refill_rate=0.0)
+    ip_rule = RateLimitRule("ip", capacity=1, refill_rate=0.0)
+    buckets = [("user:a", user_rule), ("ip:1", ip_rule)]
+
+    assert all(state.allowed for state in await store.consume_all(buckets))
+    for _ in range(3):
+        user_state, ip_state = await store.consume_all(buckets)
+        assert user_state.allowed and not ip_state.allowed
+
+    # Only the first, accepted request consumed a user token
+    assert (await store.consume("user:a", user_rule)).remaining == 3
+
+
+async def test_idle_and_excess_buckets_are_evicted():
+    store = InMemoryRateLimitStore(max_buckets=3, idle_ttl=600)
+    rule = RateLimitRule("test", capacity=1, refill_rate=1.0)
+    for key in "abcde":
+        await store.consume(key, rule)
+
+    assert len(store) == 3
+    assert list(store._buckets) == ["c", "d", "e"]
+
+
+async def test_bucket_cap_holds_when_a_request_touches_several_buckets():
+    store = InMemoryRateLimitStore(max_buckets=3, idle_ttl=600)
+    rule = RateLimitRule("test", capacity=5, refill_rate=1.0)
+    await store.consume_all([("a", rule), ("b", rule), ("c", rule)])
+
+    await store.consume_all([("d", rule), ("e", rule)])
+
+    assert list(store._buckets) == ["c", "d", "e"]
+
+
+async def test_idle_buckets_are_dropped_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    store = InMemoryRateLimitStore(max_buckets=100, idle_ttl=60)
+    rule = RateLimitRule("test", capacity=5, refill_rate=1.0)
+    await store.consume("idle", rule)
+    now[0] += 30
+    await store.consume("recent", rule)
+
+    now[0] += 31
+    await store.consume("new", rule)
+
+    assert list(store._buckets) == ["recent", "new"]
+
+
+def test_tasks_route_uses_user_and_ip_buckets():
+    middleware = RateLimitMiddleware(app=None, store=InMemoryRateLimitStore())
+    token = security.create_access_token("user@example.com")
+
+    buckets = middleware.get_buckets(make_request("/api/v1/tasks/", f"Bearer {token}"))
+
+    assert [key for key, _ in buckets] == ["tasks-user:user@example.com", "tasks-ip:10.0.0.1"]
+    assert middleware.get_buckets(make_request("/health/live")) == []
+
+
+def test_token_is_decoded_once_per_request(monkeypatch):
+    calls = []
+    decode = security.get_token_subject
+    monkeypatch.setattr(security, "get_token_subject", lambda token: calls.append(token) or decode(token))
+    request = make_request("/api/v1/tasks/", f"Bearer {security.create_access_token('user@example.com')}")
+
+    assert security.get_request_subject(request) == "user@example.com"
+    assert security.get_request_subject(request) == "user@example.com"
+    assert len(calls) == 1
+
+
+def test_login_is_limited_per_ip(client, monkeypatch):
+    monkeypatch.setattr(rate_limit, "LOGIN_IP_RULE", RateLimitRule.per_minute("login-ip", burst=2, per_minute=1))
+
+    statuses = [
+        client.post("/api/v1/auth/login", json={"username": "nobody@example.com", "password": "x"}).status_code
+        for _ in range(3)
+    ]
+
+    assert statuses[:2] == [401, 401]
+    assert statuses[2] == 429
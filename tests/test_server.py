@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from app import server
+from app.core.config import settings
+
+
+def test_pool_sizing_splits_budget_between_workers():
+    assert server.pool_sizing(80, 4) == (13, 7)
+    # One connection per worker even when the budget is too small
+    assert server.pool_sizing(2, 4) == (1, 0)
+
+
+def test_pool_sizing_keeps_background_connections_in_each_share():
+    pool_size, max_overflow = server.pool_sizing(80, 4, background=5)
+
+    assert pool_size + max_overflow == 20
+    assert pool_size == 5 + 10
+    # Shares smaller than the background jobs' needs are kept open entirely
+    assert server.pool_sizing(12, 4, background=5) == (3, 0)
+
+
+def test_background_connections_follow_enabled_jobs(monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_BACKEND", "sqlalchemy")
+    monkeypatch.setattr(settings, "BACKGROUND_JOBS_ENABLED", True)
+    monkeypatch.setattr(settings, "TASK_ARCHIVE_ENABLED", True)
+    monkeypatch.setattr(settings, "OUTBOX_ENABLED", True)
+    monkeypatch.setattr(settings, "OUTBOX_WORKER_ENABLED", True)
+    monkeypatch.setattr(settings, "OUTBOX_WORKERS", 3)
+    assert server.background_connections() == 1 + 1 + 3 + 1
+
+    monkeypatch.setattr(settings, "OUTBOX_WORKER_ENABLED", False)
+    monkeypatch.setattr(settings, "TASK_ARCHIVE_ENABLED", False)
+    assert server.background_connections() == 1
+
+    monkeypatch.setattr(settings, "BACKGROUND_JOBS_ENABLED", False)
+    assert server.background_connections() == 0
+
+
+@pytest.fixture
+def run_main(monkeypatch):
+    """Run server.main() without migrating or starting uvicorn."""
+    calls = []
+    monkeypatch.setattr(server, "setup_logging", lambda: None)
+    monkeypatch.setattr(server.uvicorn, "run", lambda *args, **kwargs: calls.append(kwargs))
+    monkeypatch.setattr(server, "background_connections", lambda: 0)
+    monkeypatch.setattr(settings, "DB_CONNECTION_BUDGET", 30)
+    for name in ("DB_POOL_SIZE", "DB_MAX_OVERFLOW"):
+        # Set first, so whatever main() sets is undone after the test
+        monkeypatch.setattr(settings, name, getattr(settings, name))
+        monkeypatch.setenv(name, "")
+        monkeypatch.delenv(name)
+
+    def run(fields_set, workers: int = 3):
+        monkeypatch.setattr(settings, "__pydantic_fields_set__", set(fields_set))
+        monkeypatch.setattr("sys.argv", ["app.server", "--workers", str(workers), "--skip-migrations"])
+        server.main()
+        assert calls[-1]["workers"] == workers
+        return os.environ.get("DB_POOL_SIZE"), os.environ.get("DB_MAX_OVERFLOW")
+
+    return run
+
+
+def test_main_derives_pool_size_from_budget(run_main):
+    assert run_main(set()) == ("6", "4")
+
+
+def test_main_keeps_explicit_pool_settings(run_main):
+    # Values read from .env are in model_fields_set but not in os.environ;
+    # the workers read the same .env
+    assert run_main({"DB_POOL_SIZE"}) == (None, "4")
+    assert settings.DB_MAX_OVERFLOW == 4
+
+
+def test_single_worker_uses_the_derived_pool_size_in_process(run_main):
+    # uvicorn serves one worker in this process with the settings already loaded
+    explicit_pool_size = settings.DB_POOL_SIZE
+
+    assert run_main({"DB_POOL_SIZE"}, workers=1) == (None, "10")
+    assert (settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW) == (explicit_pool_size, 10)
+
+    assert run_main(set(), workers=1) == ("20", "10")
+    assert (settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW) == (20, 10)
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.models.task import Task
+from app.models.user import User
+from app.repositories.sql import (
+    COUNT_TASKS_STMT,
+    GET_TASK_STMT,
+    LIST_TASKS_STMT,
+    SQLAlchemyTaskRepository,
+    SQLAlchemyUserRepository,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def test_prebuilt_statements_memoize_their_cache_key():
+    for stmt in (COUNT_TASKS_STMT, LIST_TASKS_STMT, GET_TASK_STMT):
+        assert stmt._generate_cache_key() is stmt._generate_cache_key()
+
+
+async def test_task_queries_bind_owner_page_and_skip_deleted_tasks(pg_user):
+    user_id, sessions = pg_user
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    async with sessions() as db:
+        tasks = [
+            Task(title=f"task {i}", owner_id=user_id, created_at=start + timedelta(minutes=i))
+            for i in range(5)
+        ]
+        tasks[2].is_deleted = True
+        db.add_all(tasks)
+        await db.commit()
+        ids = [task.id for task in tasks]
+
+    async with sessions() as db:
+        repo = SQLAlchemyTaskRepository(db)
+        assert await repo.count(user_id) == 4
+        assert [task.id for task in await repo.list(user_id, 0, 2)] == [ids[4], ids[3]]
+        assert [task.id for task in await repo.list(user_id, 2, 2)] == [ids[1], ids[0]]
+        assert (await repo.get(ids[1], user_id)).title == "task 1"
+        assert await repo.get(ids[2], user_id) is None
+        # Other owners see nothing, through the same cached statements
+        assert await repo.count(-1) == 0
+        assert await repo.get(ids[1], -1) is None
+
+
+async def test_user_lookup_by_email(pg_user):
+    user_id, sessions = pg_user
+    async with sessions() as db:
+        email = (await db.execute(select(User.email).where(User.id == user_id))).scalar()
+        repo = SQLAlchemyUserRepository(db)
+
+        assert (await repo.get_by_email(email)).id == user_id
+        assert await repo.get_by_email(f"missing-{email}") is None
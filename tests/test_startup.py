@@ -0,0 +1,43 @@
+import pytest
+
+from benchmarks import importtime
+
+
+def test_parse_importtime_sums_self_time_per_package():
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |   fastapi.types",
+        "import time:        50 |        150 | fastapi",
+        "import time:        20 |         20 | app",
+    ])
+
+    cumulative, by_package = importtime.parse_importtime(stderr)
+
+    assert cumulative == {"fastapi.types": 100, "fastapi": 150, "app": 20}
+    assert by_package == {"fastapi": 150, "app": 20}
+
+
+def test_create_app_loads_no_lazy_module():
+    # A fresh interpreter: this process has imported far more than the app does
+    result = importtime.probe()
+
+    assert "app.main" in result["modules"]
+    assert importtime.forbidden_imports(result["modules"]) == []
+    assert importtime.forbidden_imports(["asyncpg.protocol", "app.core"]) == ["asyncpg"]
+
+
+@pytest.mark.anyio
+async def test_engine_is_created_on_demand_and_disposed():
+    from app.db import session
+    from app.main import create_app
+
+    create_app()
+    assert session.engine is None
+
+    engine = session.init_engine()
+    assert session.init_engine() is engine
+    assert session.AsyncSessionLocal.kw["bind"] is engine
+
+    await session.dispose_engine()
+    assert session.engine is None
+    assert session.AsyncSessionLocal.kw["bind"] is None